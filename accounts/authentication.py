@@ -0,0 +1,106 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import DEFAULT_DB_ALIAS
+from rest_framework.authentication import TokenAuthentication
+
+
+class TokenCache:
+    """
+    LRU cache of resolved tokens, bounded in size and with a TTL. Entries
+    hold the field values of the user and of the token (see
+    `CachedTokenAuthentication`), never model instances.
+
+    It is local to the process: invalidations (see `accounts.signals`) only
+    reach the process where the change happened, and the other workers see
+    them when their entries expire.
+    """
+
+    def __init__(self, max_size, ttl):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self.lock:
+            self.entries[key] = (time.monotonic() + self.ttl, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def delete(self, key):
+        with self.lock:
+            self.entries.pop(key, None)
+
+    def delete_user(self, user_pk):
+        """Evict every token of a user. The scan is bounded by `max_size`."""
+        with self.lock:
+            keys = [
+                key
+                for key, (_, (_, token_values)) in self.entries.items()
+                if token_values["user_id"] == user_pk
+            ]
+            for key in keys:
+                del self.entries[key]
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+token_cache = TokenCache(settings.TOKEN_CACHE_SIZE, settings.TOKEN_CACHE_TTL)
+
+
+def get_field_values(instance):
+    """Values of the concrete fields of a model instance, by attname."""
+    return {
+        field.attname: getattr(instance, field.attname)
+        for field in instance._meta.concrete_fields
+    }
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    `TokenAuthentication` that keeps the field values of the resolved user
+    and token in `token_cache`, so a cached token costs no query. Invalid
+    tokens and inactive users are never cached.
+
+    Each request gets its own instances, built from the cached values:
+    what a request stores on its user (such as the permission caches of
+    `PermissionsMixin`) is never seen by another request or thread.
+    """
+
+    cache = token_cache
+
+    def authenticate_credentials(self, key):
+        values = self.cache.get(key)
+        if values is None:
+            user, token = super().authenticate_credentials(key)
+            self.cache.set(key, (get_field_values(user), get_field_values(token)))
+            return user, token
+
+        user_values, token_values = values
+        user = get_user_model().from_db(
+            DEFAULT_DB_ALIAS, list(user_values), list(user_values.values())
+        )
+        token = self.get_model().from_db(
+            DEFAULT_DB_ALIAS, list(token_values), list(token_values.values())
+        )
+        token.user = user
+        return user, token
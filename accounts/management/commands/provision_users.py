@@ -0,0 +1,69 @@
+import csv
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        "Create users from a CSV file with the columns `email` and `password` "
+        "(optional: empty makes the password unusable). Passwords are hashed "
+        "across a process pool, and the users and their tokens are inserted "
+        "in bulk. Emails that already exist, or repeat in the file, are "
+        "skipped."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Path of the CSV file")
+        parser.add_argument(
+            "--processes",
+            type=int,
+            help="Number of hashing processes (default: one per CPU)",
+        )
+        parser.add_argument(
+            "--tokens",
+            help="Write the email and token of the created users to this CSV file",
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        try:
+            with open(path, newline="", encoding="utf-8") as file:
+                reader = csv.DictReader(file)
+                if "email" not in (reader.fieldnames or []):
+                    raise CommandError("Missing columns: email")
+                rows = {}
+                skipped = 0
+                for row in reader:
+                    email = User.objects.normalize_email((row["email"] or "").strip())
+                    if not email or email in rows:
+                        skipped += 1
+                        continue
+                    rows[email] = row.get("password") or None
+        except (OSError, UnicodeDecodeError, csv.Error) as error:
+            raise CommandError(f"Could not provision {path}: {error}")
+
+        existing = set(
+            User.objects.filter(email__in=rows).values_list("email", flat=True)
+        )
+        users = User.objects.bulk_create_users(
+            [
+                (email, password, {})
+                for email, password in rows.items()
+                if email not in existing
+            ],
+            processes=options["processes"],
+        )
+
+        if options["tokens"]:
+            with open(options["tokens"], "w", newline="", encoding="utf-8") as file:
+                writer = csv.writer(file)
+                writer.writerow(["email", "token"])
+                writer.writerows((user.email, user.auth_token.key) for user in users)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{len(users)} users created, {skipped + len(existing)} skipped."
+            )
+        )
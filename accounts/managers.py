@@ -1,4 +1,10 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import django
 from django.contrib.auth.base_user import BaseUserManager
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
 
 
 class CustomUserManager(BaseUserManager):
@@ -32,3 +38,48 @@ class CustomUserManager(BaseUserManager):
         if extra_fields.get("is_superuser") is not True:
             raise ValueError("Superuser must have is_superuser=True.")
         return self.create_user(email, password, **extra_fields)
+
+    def bulk_create_users(self, users, processes=None, batch_size=1000):
+        """
+        Create users from (email, password, extra_fields) tuples, with their
+        tokens, and return them.
+
+        Unlike `create_user`, the passwords are hashed across a pool of
+        `processes` (default: one per CPU; 1 hashes them in this process),
+        the users are inserted with `bulk_create` and the tokens, which the
+        `post_save` signal doesn't create here, with a single `bulk_create`
+        per batch. A `None` password makes the password unusable.
+        """
+        # Imported here: the token model depends on the user model.
+        from rest_framework.authtoken.models import Token
+
+        users = list(users)
+        passwords = [password for _, password, _ in users]
+        processes = processes or os.cpu_count() or 1
+        if processes > 1 and len(passwords) > 1:
+            # `django.setup` configures the workers when they aren't forked.
+            with ProcessPoolExecutor(processes, initializer=django.setup) as pool:
+                chunksize = max(1, len(passwords) // (processes * 4))
+                hashes = list(pool.map(make_password, passwords, chunksize=chunksize))
+        else:
+            hashes = [make_password(password) for password in passwords]
+
+        instances = []
+        for (email, _, extra_fields), password_hash in zip(users, hashes):
+            if not email:
+                raise ValueError("The Email must be set")
+            instances.append(
+                self.model(
+                    email=self.normalize_email(email),
+                    password=password_hash,
+                    **extra_fields,
+                )
+            )
+
+        with transaction.atomic(using=self.db):
+            instances = self.bulk_create(instances, batch_size=batch_size)
+            Token.objects.using(self.db).bulk_create(
+                [Token(key=Token.generate_key(), user=user) for user in instances],
+                batch_size=batch_size,
+            )
+        return instances
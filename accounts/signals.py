@@ -1,10 +1,45 @@
 from django.conf import settings
-from django.db.models.signals import post_save
+from django.contrib.auth import get_user_model
+from django.db.models.signals import m2m_changed, post_delete, post_save
 from django.dispatch import receiver
 from rest_framework.authtoken.models import Token
 
+from .authentication import token_cache
+
+User = get_user_model()
+
 
 @receiver(post_save, sender=settings.AUTH_USER_MODEL)
 def create_auth_token(sender, instance=None, created=False, **kwargs):
     if created:
         Token.objects.create(user=instance)
+
+
+@receiver([post_save, post_delete], sender=settings.AUTH_USER_MODEL)
+def invalidate_user_tokens(sender, instance=None, created=False, **kwargs):
+    # Covers deactivation and any change to the cached user
+    if not created:
+        token_cache.delete_user(instance.pk)
+
+
+@receiver(post_delete, sender=Token)
+def invalidate_deleted_token(sender, instance=None, **kwargs):
+    token_cache.delete(instance.key)
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+@receiver(m2m_changed, sender=User.user_permissions.through)
+def invalidate_user_permissions(
+    sender, instance=None, action=None, reverse=False, pk_set=None, **kwargs
+):
+    # Group and permission changes don't save the user
+    if not action.startswith("post_"):
+        return
+    if not reverse:
+        token_cache.delete_user(instance.pk)
+    elif pk_set is None:
+        # A group or permission was cleared of all its users
+        token_cache.clear()
+    else:
+        for user_pk in pk_set:
+            token_cache.delete_user(user_pk)
@@ -0,0 +1,173 @@
+import csv
+import io
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+
+from .authentication import CachedTokenAuthentication, TokenCache, token_cache
+
+User = get_user_model()
+
+
+class CachedTokenAuthenticationTest(APITestCase):
+    def setUp(self):
+        token_cache.clear()
+        self.user = User.objects.create_user(
+            email="test@example.com", password="testpass"
+        )
+
+        self.token = Token.objects.get(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token.key}")
+        self.url = reverse("appointment-list")
+
+    def test_cached_token_costs_no_query(self):
+        # token, conditional GET fingerprint, count, page
+        with self.assertNumQueries(4):
+            self.client.get(self.url)
+        # conditional GET fingerprint, count, page
+        with self.assertNumQueries(3):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_deleted_token_is_revoked(self):
+        self.client.get(self.url)
+        self.token.delete()
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_deactivated_user_is_revoked(self):
+        self.client.get(self.url)
+        self.user.is_active = False
+        self.user.save()
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_each_request_gets_its_own_user(self):
+        authentication = CachedTokenAuthentication()
+        first, _ = authentication.authenticate_credentials(self.token.key)
+        self.assertFalse(first.has_perm("accounts.view_user"))
+        with self.assertNumQueries(0):
+            user, token = authentication.authenticate_credentials(self.token.key)
+        self.assertIsNot(user, first)
+        self.assertEqual(user, self.user)
+        self.assertEqual(user.email, self.user.email)
+        # Permissions cached by the first request are not carried over
+        self.assertFalse(hasattr(user, "_perm_cache"))
+        self.assertEqual(token, self.token)
+        self.assertIs(token.user, user)
+
+    def test_group_and_permission_changes_evict_the_user(self):
+        self.client.get(self.url)
+        group = Group.objects.create(name="staff")
+        self.user.groups.add(group)
+        self.assertIsNone(token_cache.get(self.token.key))
+
+        self.client.get(self.url)
+        group.user_set.remove(self.user)
+        self.assertIsNone(token_cache.get(self.token.key))
+
+    def test_invalid_token_is_not_cached(self):
+        self.client.credentials(HTTP_AUTHORIZATION="Token invalid")
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertIsNone(token_cache.get("invalid"))
+
+
+class TokenCacheTest(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email="test@example.com", password="testpass"
+        )
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = TokenCache(max_size=2, ttl=60)
+        cache.set("a", (self.user, None))
+        cache.set("b", (self.user, None))
+        cache.get("a")
+        cache.set("c", (self.user, None))
+        self.assertIsNotNone(cache.get("a"))
+        self.assertIsNone(cache.get("b"))
+        self.assertIsNotNone(cache.get("c"))
+
+    def test_expired_entry_is_not_returned(self):
+        cache = TokenCache(max_size=2, ttl=0)
+        cache.set("a", (self.user, None))
+        self.assertIsNone(cache.get("a"))
+
+
+class BulkCreateUsersTest(APITestCase):
+    def test_users_and_tokens_are_created_in_bulk(self):
+        # savepoint, users INSERT, tokens INSERT, release savepoint
+        with self.assertNumQueries(4):
+            users = User.objects.bulk_create_users(
+                [
+                    ("ana@EXAMPLE.com", "s3cret-pass", {}),
+                    ("bia@example.com", None, {"is_staff": True}),
+                ],
+                processes=1,
+            )
+
+        ana, bia = User.objects.order_by("email")
+        self.assertEqual([user.pk for user in users], [ana.pk, bia.pk])
+        self.assertEqual(ana.email, "ana@example.com")
+        self.assertTrue(ana.check_password("s3cret-pass"))
+        self.assertFalse(bia.has_usable_password())
+        self.assertTrue(bia.is_staff)
+        for user in users:
+            token = Token.objects.get(user=user)
+            self.assertEqual(token.key, user.auth_token.key)
+            self.assertEqual(len(token.key), len(Token.generate_key()))
+
+    def test_passwords_are_hashed_across_processes(self):
+        users = User.objects.bulk_create_users(
+            [(f"user{index}@example.com", f"pass-{index}", {}) for index in range(3)],
+            processes=2,
+        )
+        for index, user in enumerate(users):
+            self.assertTrue(user.check_password(f"pass-{index}"))
+
+    def test_missing_email_is_rejected(self):
+        with self.assertRaises(ValueError):
+            User.objects.bulk_create_users([("", "pass", {})], processes=1)
+        self.assertFalse(User.objects.exists())
+
+    def test_provision_users_command(self):
+        User.objects.create_user(email="ana@example.com", password="testpass")
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = f"{directory.name}/users.csv"
+        tokens_path = f"{directory.name}/tokens.csv"
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(
+                "email,password\n"
+                "ana@example.com,other-pass\n"
+                "bia@example.com,bia-pass\n"
+                "bia@example.com,again\n"
+                "caio@example.com,\n"
+            )
+
+        stdout = io.StringIO()
+        call_command(
+            "provision_users", path, processes=1, tokens=tokens_path, stdout=stdout
+        )
+        self.assertIn("2 users created, 2 skipped.", stdout.getvalue())
+
+        bia = User.objects.get(email="bia@example.com")
+        self.assertTrue(bia.check_password("bia-pass"))
+        with open(tokens_path, encoding="utf-8") as file:
+            rows = list(csv.DictReader(file))
+        self.assertEqual(
+            {row["email"]: row["token"] for row in rows},
+            {
+                token.user.email: token.key
+                for token in Token.objects.filter(
+                    user__email__in=["bia@example.com", "caio@example.com"]
+                ).select_related("user")
+            },
+        )
@@ -2,4 +2,7 @@ from django.contrib import admin
 
 from .models import Appointment
 
-admin.site.register(Appointment)
+
+@admin.register(Appointment)
+class AppointmentAdmin(admin.ModelAdmin):
+    list_select_related = ["professional"]
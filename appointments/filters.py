@@ -0,0 +1,35 @@
+from django_filters import rest_framework as filters
+
+from professionals.models import Professional
+
+from .models import Appointment
+
+
+class NumberInFilter(filters.BaseInFilter, filters.NumberFilter):
+    pass
+
+
+class AppointmentFilter(filters.FilterSet):
+    """
+    Filter appointments by professional(s), profession and time range.
+
+    `professional__in` with a `scheduled_at` range is answered by the
+    (professional_id, scheduled_at) unique index, and ranges across every
+    professional by the BRIN index on `scheduled_at`.
+    """
+
+    professional__in = NumberInFilter(field_name="professional_id", lookup_expr="in")
+    profession = filters.ChoiceFilter(
+        field_name="professional__profession",
+        choices=Professional.ProfessionChoices.choices,
+    )
+    scheduled_at__gte = filters.IsoDateTimeFilter(
+        field_name="scheduled_at", lookup_expr="gte"
+    )
+    scheduled_at__lt = filters.IsoDateTimeFilter(
+        field_name="scheduled_at", lookup_expr="lt"
+    )
+
+    class Meta:
+        model = Appointment
+        fields = ["professional"]
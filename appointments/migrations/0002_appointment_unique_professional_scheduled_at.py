@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-17 18:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("appointments", "0001_initial"),
+        ("professionals", "0002_alter_professional_email_alter_professional_phone"),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name="appointment",
+            constraint=models.UniqueConstraint(
+                fields=("professional", "scheduled_at"),
+                name="unique_appointment_professional_scheduled_at",
+            ),
+        ),
+    ]
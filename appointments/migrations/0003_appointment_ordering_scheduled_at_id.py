@@ -0,0 +1,24 @@
+# Generated by Django 5.2.6 on 2026-10-17 18:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("appointments", "0002_appointment_unique_professional_scheduled_at"),
+        ("professionals", "0002_alter_professional_email_alter_professional_phone"),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name="appointment",
+            options={"ordering": ["scheduled_at", "id"]},
+        ),
+        migrations.AddIndex(
+            model_name="appointment",
+            index=models.Index(
+                fields=["scheduled_at", "id"], name="appointment_scheduled_id_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.6 on 2026-10-17 18:17
+
+import django.contrib.postgres.indexes
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("appointments", "0003_appointment_ordering_scheduled_at_id"),
+        ("professionals", "0003_workinghours"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="appointment",
+            index=django.contrib.postgres.indexes.BrinIndex(
+                fields=["scheduled_at"], name="appointment_scheduled_brin"
+            ),
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.2.6 on 2026-10-17 19:02
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# Name generated by Django for the constraint created in 0001_initial
+DJANGO_CONSTRAINT = "appointments_appoint_professional_id_709c4baf_fk_professio"
+CASCADE_CONSTRAINT = "appointments_appointment_professional_id_fk_cascade"
+
+
+def replace_foreign_key(old_name, new_name, action):
+    """
+    Recreate the foreign key constraint of `Appointment.professional` under
+    `new_name`, with the given ON DELETE action and Django's deferral.
+    """
+    return f"""
+        ALTER TABLE appointments_appointment
+            DROP CONSTRAINT "{old_name}",
+            ADD CONSTRAINT "{new_name}" FOREIGN KEY (professional_id)
+                REFERENCES professionals_professional (id)
+                ON DELETE {action} DEFERRABLE INITIALLY DEFERRED;
+    """
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("appointments", "0004_appointment_scheduled_at_brin"),
+        ("professionals", "0008_backfill_full_address"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="appointment",
+            name="professional",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.DO_NOTHING,
+                related_name="appointments",
+                to="professionals.professional",
+                verbose_name="Profissional de saúde",
+            ),
+        ),
+        migrations.RunSQL(
+            sql=replace_foreign_key(DJANGO_CONSTRAINT, CASCADE_CONSTRAINT, "CASCADE"),
+            reverse_sql=replace_foreign_key(
+                CASCADE_CONSTRAINT, DJANGO_CONSTRAINT, "NO ACTION"
+            ),
+        ),
+    ]
@@ -1,3 +1,4 @@
+from django.contrib.postgres.indexes import BrinIndex
 from django.db import models
 
 
@@ -6,12 +7,29 @@ class Appointment(models.Model):
         to="professionals.Professional",
         verbose_name="Profissional de saúde",
         related_name="appointments",
-        on_delete=models.CASCADE,
+        # Cascaded by the database (ON DELETE CASCADE, set in migration
+        # 0005), so deleting a professional doesn't load its appointments.
+        on_delete=models.DO_NOTHING,
     )
     scheduled_at = models.DateTimeField(verbose_name="Data e Horário")
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        ordering = ["scheduled_at", "id"]
+        indexes = [
+            models.Index(
+                fields=["scheduled_at", "id"], name="appointment_scheduled_id_idx"
+            ),
+            BrinIndex(fields=["scheduled_at"], name="appointment_scheduled_brin"),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["professional", "scheduled_at"],
+                name="unique_appointment_professional_scheduled_at",
+            )
+        ]
+
     def __str__(self):
         date = self.scheduled_at.date().isoformat()
         time = self.scheduled_at.time().isoformat()
@@ -0,0 +1,217 @@
+from base64 import b64decode, b64encode
+from collections import OrderedDict
+from urllib import parse
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from config.asynchronous import AsyncPageNumberPagination
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset (cursor) pagination over the ("scheduled_at", "id") index.
+
+    Each page continues from the last row of the previous one with an
+    index range scan, so deep pages cost the same as the first one and rows
+    inserted or deleted while a client walks the list are never skipped or
+    repeated. Unlike DRF's `CursorPagination`, the position includes the
+    primary key, so appointments sharing the same time are ordered without
+    an offset.
+    """
+
+    cursor_query_param = "cursor"
+    page_size = api_settings.PAGE_SIZE
+    invalid_cursor_message = "Cursor inválido."
+
+    def paginate_queryset(self, queryset, request, view=None):
+        queryset, position = self.get_page_queryset(queryset, request)
+        return self.set_page(list(queryset), position)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        queryset, position = self.get_page_queryset(queryset, request)
+        return self.set_page([row async for row in queryset], position)
+
+    def get_page_queryset(self, queryset, request):
+        """
+        Return the rows of the page, plus one to tell if there are more, and
+        the position of the cursor.
+        """
+        self.base_url = request.build_absolute_uri()
+        self.reverse, position = self.decode_cursor(request)
+
+        if self.reverse:
+            queryset = queryset.order_by("-scheduled_at", "-id")
+        else:
+            queryset = queryset.order_by("scheduled_at", "id")
+
+        if position is not None:
+            scheduled_at, pk = position
+            if self.reverse:
+                queryset = queryset.filter(scheduled_at__lte=scheduled_at).filter(
+                    Q(scheduled_at__lt=scheduled_at) | Q(id__lt=pk)
+                )
+            else:
+                queryset = queryset.filter(scheduled_at__gte=scheduled_at).filter(
+                    Q(scheduled_at__gt=scheduled_at) | Q(id__gt=pk)
+                )
+
+        return queryset[: self.page_size + 1], position
+
+    def set_page(self, results, position):
+        has_more = len(results) > self.page_size
+        self.page = results[: self.page_size]
+
+        if self.reverse:
+            self.page.reverse()
+            self.has_previous = has_more
+            self.has_next = position is not None
+        else:
+            self.has_next = has_more
+            self.has_previous = position is not None
+
+        return self.page
+
+    def get_paginated_response(self, data):
+        return Response(
+            OrderedDict(
+                [
+                    ("next", self.get_next_link()),
+                    ("previous", self.get_previous_link()),
+                    ("results", data),
+                ]
+            )
+        )
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        if not self.page:
+            # Walking backwards past the first row: restart from the beginning.
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(False, *self.get_position(self.page[-1]))
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(True, *self.get_position(self.page[0]))
+
+    @staticmethod
+    def get_position(row):
+        # Model instances, or dicts on the `.values()` read path
+        if isinstance(row, dict):
+            return row["scheduled_at"], row["id"]
+        return row.scheduled_at, row.id
+
+    def decode_cursor(self, request):
+        """
+        Return the direction and the (scheduled_at, id) position of the cursor.
+        """
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return False, None
+
+        try:
+            querystring = b64decode(encoded.encode("ascii")).decode("ascii")
+            tokens = parse.parse_qs(querystring, keep_blank_values=True)
+            reverse = bool(int(tokens["r"][0]))
+            scheduled_at = parse_datetime(tokens["t"][0])
+            pk = int(tokens["i"][0])
+        except (TypeError, ValueError, KeyError, IndexError):
+            raise NotFound(self.invalid_cursor_message)
+
+        if scheduled_at is None:
+            raise NotFound(self.invalid_cursor_message)
+        return reverse, (scheduled_at, pk)
+
+    def encode_cursor(self, reverse, scheduled_at, pk):
+        tokens = {"r": int(reverse), "t": scheduled_at.isoformat(), "i": pk}
+        querystring = parse.urlencode(tokens, doseq=True)
+        encoded = b64encode(querystring.encode("ascii")).decode("ascii")
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                "name": self.cursor_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Valor do cursor de paginação.",
+                "schema": {"type": "string"},
+            }
+        ]
+
+
+class AppointmentPagination(BasePagination):
+    """
+    Page number pagination by default, or keyset pagination when the request
+    asks for it with `?pagination=cursor` (or already carries a cursor).
+    """
+
+    mode_query_param = "pagination"
+    cursor_mode = "cursor"
+
+    def __init__(self):
+        self.page_number_pagination = AsyncPageNumberPagination()
+        self.keyset_pagination = KeysetPagination()
+        self.paginator = self.page_number_pagination
+
+    def get_paginator(self, request):
+        mode = request.query_params.get(self.mode_query_param)
+        cursor_param = self.keyset_pagination.cursor_query_param
+        if mode == self.cursor_mode or cursor_param in request.query_params:
+            return self.keyset_pagination
+        return self.page_number_pagination
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.paginator = self.get_paginator(request)
+        return self.paginator.paginate_queryset(queryset, request, view)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        self.paginator = self.get_paginator(request)
+        return await self.paginator.apaginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        return self.paginator.get_paginated_response(data)
+
+    def get_paginated_response_schema(self, schema):
+        return self.page_number_pagination.get_paginated_response_schema(schema)
+
+    @property
+    def display_page_controls(self):
+        return self.paginator.display_page_controls
+
+    def to_html(self):
+        return self.paginator.to_html()
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            *self.page_number_pagination.get_schema_operation_parameters(view),
+            {
+                "name": self.mode_query_param,
+                "required": False,
+                "in": "query",
+                "description": (
+                    "Use `cursor` para paginação por cursor, ordenada por "
+                    "`scheduled_at` e `id`."
+                ),
+                "schema": {"type": "string", "enum": [self.cursor_mode]},
+            },
+            *self.keyset_pagination.get_schema_operation_parameters(view),
+        ]
@@ -0,0 +1,45 @@
+import codecs
+import json
+
+from django.conf import settings
+from rest_framework import serializers
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+from rest_framework.settings import api_settings
+
+
+class NDJSONParser(BaseParser):
+    """
+    Parse newline delimited JSON (one object per line).
+
+    The request stream is decoded and parsed line by line. When the view sets
+    `bulk_max_size`, parsing stops with a validation error as soon as one
+    item more is read, so an oversized body is rejected without parsing the
+    rest of it. The parsed items are still returned as a list.
+    """
+
+    media_type = "application/x-ndjson"
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get("encoding", settings.DEFAULT_CHARSET)
+        max_size = getattr(parser_context.get("view"), "bulk_max_size", None)
+        reader = codecs.getreader(encoding)(stream)
+
+        items = []
+        for line_number, line in enumerate(reader, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            if max_size is not None and len(items) >= max_size:
+                message = serializers.ListSerializer.default_error_messages[
+                    "max_length"
+                ].format(max_length=max_size)
+                raise serializers.ValidationError(
+                    {api_settings.NON_FIELD_ERRORS_KEY: [message]}, code="max_length"
+                )
+            try:
+                items.append(json.loads(line))
+            except ValueError as exc:
+                raise ParseError(f"NDJSON parse error on line {line_number} - {exc}")
+        return items
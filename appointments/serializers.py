@@ -1,11 +1,32 @@
+from django.db import IntegrityError, transaction
 from django.utils import timezone
 from rest_framework import serializers
+from rest_framework.settings import api_settings
 
 from professionals.models import Professional
-from professionals.serializers import PartialProfessionalSerializer
+from professionals.serializers import (
+    DateRangeQuerySerializer,
+    PartialProfessionalSerializer,
+)
 
 from .models import Appointment
 
+DOUBLE_BOOKING_CONSTRAINT = "unique_appointment_professional_scheduled_at"
+DOUBLE_BOOKING_MESSAGE = "Esse profissional já possui uma consulta neste horário."
+
+
+def is_double_booking(error):
+    """Check if an IntegrityError was raised by the double booking constraint."""
+    return DOUBLE_BOOKING_CONSTRAINT in str(error)
+
+
+def validate_not_in_past(value):
+    if value < timezone.now():
+        raise serializers.ValidationError(
+            "Uma consulta não pode ser marcada no passado."
+        )
+    return value
+
 
 class AppointmentSerializer(serializers.ModelSerializer):
     professional_id = serializers.PrimaryKeyRelatedField(
@@ -23,34 +44,189 @@ class AppointmentSerializer(serializers.ModelSerializer):
             "created_at",
             "updated_at",
         ]
+        # Double booking is enforced by the database unique constraint,
+        # so the UniqueTogetherValidator pre-check query is skipped.
+        validators = []
+
+    @classmethod
+    def setup_eager_loading(cls, queryset):
+        """
+        Load the nested professional in the same query as the appointments.
+
+        Only the columns rendered by this serializer and by
+        `PartialProfessionalSerializer` are selected, so the query follows
+        any change to their `Meta.fields`. The professional `updated_at` is
+        also loaded, as it is part of the conditional GET validators.
+        """
+        model_fields = {field.name for field in Appointment._meta.concrete_fields}
+        fields = [name for name in cls.Meta.fields if name in model_fields]
+        professional_fields = [
+            f"professional__{name}"
+            for name in [*PartialProfessionalSerializer.Meta.fields, "updated_at"]
+        ]
+        return queryset.select_related("professional").only(
+            *fields, *professional_fields
+        )
 
     def validate_scheduled_at(self, value):
-        if value < timezone.now():
+        return validate_not_in_past(value)
+
+    def create(self, validated_data):
+        try:
+            with transaction.atomic():
+                return super().create(validated_data)
+        except IntegrityError as error:
+            self.raise_if_double_booking(error)
+            raise
+
+    def update(self, instance, validated_data):
+        try:
+            with transaction.atomic():
+                return super().update(instance, validated_data)
+        except IntegrityError as error:
+            self.raise_if_double_booking(error)
+            raise
+
+    def raise_if_double_booking(self, error):
+        """
+        Translate a double booking constraint violation into the same
+        validation error returned by the API for any other invalid data.
+        """
+        if is_double_booking(error):
             raise serializers.ValidationError(
-                "Uma consulta não pode ser marcada no passado."
+                {api_settings.NON_FIELD_ERRORS_KEY: [DOUBLE_BOOKING_MESSAGE]}
             )
-        return value
 
-    def validate(self, attrs):
-        instance = getattr(self, "instance", None)
 
-        professional = attrs.get("professional") or (
-            instance.professional if instance else None
-        )
-        scheduled_at = attrs.get("scheduled_at") or (
-            instance.scheduled_at if instance else None
-        )
+class UpcomingAppointmentSerializer(serializers.ModelSerializer):
+    """Appointment embedded in its professional, see `?include=`."""
 
-        qs = Appointment.objects.filter(
-            professional=professional, scheduled_at=scheduled_at
-        )
+    class Meta:
+        model = Appointment
+        fields = ["id", "scheduled_at"]
+        read_only_fields = ["id", "scheduled_at"]
+
+
+class AppointmentBulkListSerializer(serializers.ListSerializer):
+    """
+    Validate and create a batch of appointments with a fixed number of queries.
 
-        if instance:
-            qs = qs.exclude(id=instance.id)
+    Every professional id is resolved in a single query and double bookings,
+    both inside the batch and against existing appointments, are detected
+    with one set-based query. Errors are returned per item, aligned with the
+    submitted list, and nothing is created unless every item is valid.
+    """
 
-        if qs.exists():
+    def to_internal_value(self, data):
+        if not isinstance(data, list):
+            message = self.error_messages["not_a_list"].format(
+                input_type=type(data).__name__
+            )
             raise serializers.ValidationError(
-                "Esse profissional já possui uma consulta neste horário."
+                {api_settings.NON_FIELD_ERRORS_KEY: [message]}, code="not_a_list"
             )
+        if not data:
+            raise serializers.ValidationError(
+                {api_settings.NON_FIELD_ERRORS_KEY: [self.error_messages["empty"]]},
+                code="empty",
+            )
+        if self.max_length is not None and len(data) > self.max_length:
+            message = self.error_messages["max_length"].format(
+                max_length=self.max_length
+            )
+            raise serializers.ValidationError(
+                {api_settings.NON_FIELD_ERRORS_KEY: [message]}, code="max_length"
+            )
+
+        errors = [{} for _ in data]
+        items = []
+        for index, item in enumerate(data):
+            try:
+                items.append(self.child.run_validation(item))
+            except serializers.ValidationError as exc:
+                errors[index] = exc.detail
+                items.append(None)
+
+        valid_items = [item for item in items if item is not None]
+        professional_ids = {item["professional_id"] for item in valid_items}
+        professionals = {}
+        booked = set()
+        if professional_ids:
+            professionals = Professional.objects.only(
+                "id", "name", "profession"
+            ).in_bulk(professional_ids)
+            booked = set(
+                Appointment.objects.filter(
+                    professional_id__in=professional_ids,
+                    scheduled_at__in={item["scheduled_at"] for item in valid_items},
+                ).values_list("professional_id", "scheduled_at")
+            )
+
+        does_not_exist = serializers.PrimaryKeyRelatedField.default_error_messages[
+            "does_not_exist"
+        ]
+        seen = set()
+        ret = []
+        for index, item in enumerate(items):
+            if item is None:
+                continue
+            professional_id = item["professional_id"]
+            slot = (professional_id, item["scheduled_at"])
+            if professional_id not in professionals:
+                errors[index] = {
+                    "professional_id": [does_not_exist.format(pk_value=professional_id)]
+                }
+            elif slot in booked or slot in seen:
+                errors[index] = {
+                    api_settings.NON_FIELD_ERRORS_KEY: [DOUBLE_BOOKING_MESSAGE]
+                }
+            else:
+                ret.append(
+                    {
+                        "professional": professionals[professional_id],
+                        "scheduled_at": item["scheduled_at"],
+                    }
+                )
+            seen.add(slot)
+
+        if any(errors):
+            raise serializers.ValidationError(errors)
+        return ret
+
+    def create(self, validated_data):
+        appointments = [Appointment(**attrs) for attrs in validated_data]
+        try:
+            with transaction.atomic():
+                return Appointment.objects.bulk_create(appointments)
+        except IntegrityError as error:
+            # Another request booked one of the slots after validation ran.
+            if is_double_booking(error):
+                raise serializers.ValidationError(
+                    {api_settings.NON_FIELD_ERRORS_KEY: [DOUBLE_BOOKING_MESSAGE]}
+                )
+            raise
+
+
+class AppointmentBulkItemSerializer(serializers.Serializer):
+    """
+    Write-only representation of one item of a bulk creation request.
+
+    The professional is validated by `AppointmentBulkListSerializer` for the
+    whole batch at once, instead of one query per item.
+    """
+
+    professional_id = serializers.IntegerField(min_value=1)
+    scheduled_at = serializers.DateTimeField()
+
+    class Meta:
+        list_serializer_class = AppointmentBulkListSerializer
+
+    def validate_scheduled_at(self, value):
+        return validate_not_in_past(value)
+
+
+class CalendarQuerySerializer(DateRangeQuerySerializer):
+    max_days = 366
+    default_days = 30
 
-        return attrs
+    group_by = serializers.ChoiceField(choices=["day", "week"], default="day")
@@ -1,15 +1,30 @@
+import asyncio
+import csv
 import datetime
+import gzip
+import io
+import json
+from unittest import mock
 
+from asgiref.sync import async_to_sync
 from django.contrib.auth import get_user_model
+from django.core.handlers.asgi import ASGIHandler
+from django.core.signals import request_finished, request_started
+from django.db import close_old_connections
+from django.test import override_settings
 from django.urls import reverse
 from django.utils import timezone
 from rest_framework import status
 from rest_framework.authtoken.models import Token
+from rest_framework.renderers import JSONRenderer
 from rest_framework.test import APITestCase
 
+from config.exports import ExportMixin
 from professionals.models import Professional
 
 from .models import Appointment
+from .serializers import AppointmentSerializer
+from .views import AppointmentViewset
 
 User = get_user_model()
 
@@ -83,6 +98,16 @@ class AppointmentApiTest(APITestCase):
         for field in self.professional_write_only_fields:
             self.assertNotIn(field, professional)
 
+    def test_list_and_retrieve_render_like_the_serializer(self):
+        expected = AppointmentSerializer(self.appointment).data
+        response = self.client.get(self.list_url)
+        self.assertEqual(
+            JSONRenderer().render(response.data["results"]),
+            JSONRenderer().render([expected]),
+        )
+        response = self.client.get(self.detail_url)
+        self.assertEqual(response.content, JSONRenderer().render(expected))
+
     def test_retrieve_appointment_not_found(self):
         url = reverse("appointment-detail", args=[999])
         response = self.client.get(url)
@@ -128,6 +153,10 @@ class AppointmentApiTest(APITestCase):
         }
         response = self.client.post(self.list_url, data, format="json")
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            response.data["non_field_errors"],
+            ["Esse profissional já possui uma consulta neste horário."],
+        )
         self.assertEqual(Appointment.objects.count(), 1)
 
     def test_create_appointment_rejects_non_existing_id(self):
@@ -217,6 +246,16 @@ class AppointmentApiTest(APITestCase):
         self.appointment.refresh_from_db()
         self.assertEqual(self.appointment.professional, self.professional)
 
+    def test_update_appointment_keeps_its_own_time(self):
+        data = {
+            "professional_id": self.professional.id,
+            "scheduled_at": self.time.isoformat(),
+        }
+        response = self.client.put(self.detail_url, data)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.appointment.refresh_from_db()
+        self.assertEqual(self.appointment.scheduled_at, self.time)
+
     def test_update_appointment_not_found(self):
         tomorrow = timezone.now() + datetime.timedelta(days=1)
         url = reverse("appointment-detail", args=[999])
@@ -447,3 +486,825 @@ class FilterApointmentByProfessionals(APITestCase):
         url = reverse("appointment-list") + "?professional=5"
         response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def get_ids(self, params):
+        response = self.client.get(reverse("appointment-list"), params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return {appointment["id"] for appointment in response.data["results"]}
+
+    def test_filter_by_multiple_professionals(self):
+        professional_ids = f"{self.professional_1.id},{self.professional_2.id}"
+        ids = self.get_ids({"professional__in": professional_ids})
+        self.assertEqual(
+            ids,
+            {self.appointment_1.id, self.appointment_2.id, self.appointment_3.id},
+        )
+
+        ids = self.get_ids({"professional__in": str(self.professional_2.id)})
+        self.assertEqual(ids, {self.appointment_3.id})
+
+    def test_filter_by_profession(self):
+        ids = self.get_ids({"profession": "GINECOLOGISTA"})
+        self.assertEqual(ids, {self.appointment_3.id})
+
+        response = self.client.get(reverse("appointment-list"), {"profession": "X"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_filter_by_scheduled_at_range(self):
+        start = self.appointment_1.scheduled_at
+        ids = self.get_ids(
+            {
+                "scheduled_at__gte": start.isoformat(),
+                "scheduled_at__lt": (start + datetime.timedelta(hours=1)).isoformat(),
+            }
+        )
+        self.assertEqual(ids, {self.appointment_1.id, self.appointment_3.id})
+
+        ids = self.get_ids(
+            {
+                "scheduled_at__gte": self.appointment_2.scheduled_at.isoformat(),
+                "professional__in": str(self.professional_1.id),
+            }
+        )
+        self.assertEqual(ids, {self.appointment_2.id})
+
+    def test_filter_by_scheduled_at_rejects_invalid_date(self):
+        response = self.client.get(
+            reverse("appointment-list"), {"scheduled_at__gte": "amanhã"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class BulkCreateAppointmentsTest(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email="test@example.com", password="testpass"
+        )
+
+        self.token = Token.objects.get(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token.key}")
+
+        self.professional = Professional.objects.create(
+            name="Alice dos Santos",
+            profession=Professional.ProfessionChoices.GENERAL_PRACTITIONER,
+            street="Rua das Couves",
+            number="123",
+            complement="Ap. 4",
+            neighborhood="Centro",
+            city="Rio de Janeiro",
+            state="RJ",
+            zipcode="12345678",
+            phone="2111112222",
+            email="alice@example.com",
+        )
+
+        self.time = timezone.now() + datetime.timedelta(days=1)
+        self.appointment = Appointment.objects.create(
+            professional=self.professional, scheduled_at=self.time
+        )
+
+        self.url = reverse("appointment-bulk")
+
+    def make_items(self, count):
+        return [
+            {
+                "professional_id": self.professional.id,
+                "scheduled_at": (
+                    self.time + datetime.timedelta(hours=index + 1)
+                ).isoformat(),
+            }
+            for index in range(count)
+        ]
+
+    def test_bulk_create_appointments(self):
+        items = self.make_items(3)
+        response = self.client.post(self.url, items, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(response.data), 3)
+        self.assertEqual(Appointment.objects.count(), 4)
+
+        item = response.data[0]
+        self.assertIsNotNone(item["id"])
+        self.assertEqual(item["professional"]["id"], self.professional.id)
+        self.assertEqual(item["professional"]["name"], self.professional.name)
+
+    def test_bulk_create_appointments_from_ndjson(self):
+        items = self.make_items(2)
+        body = "\n".join(json.dumps(item) for item in items) + "\n"
+        response = self.client.post(self.url, body, content_type="application/x-ndjson")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(response.data), 2)
+        self.assertEqual(Appointment.objects.count(), 3)
+
+    def test_bulk_create_appointments_runs_a_fixed_number_of_queries(self):
+        # token, professionals, conflicts, savepoint, insert, release savepoint
+        with self.assertNumQueries(6):
+            response = self.client.post(self.url, self.make_items(50), format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Appointment.objects.count(), 51)
+
+    def test_bulk_create_appointments_returns_errors_per_item(self):
+        items = self.make_items(2)
+        items += [
+            {"professional_id": 999, "scheduled_at": items[0]["scheduled_at"]},
+            {"professional_id": self.professional.id},
+            {
+                "professional_id": self.professional.id,
+                "scheduled_at": self.time.isoformat(),
+            },
+            items[1],
+        ]
+        response = self.client.post(self.url, items, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(len(response.data), 6)
+        self.assertEqual(response.data[0], {})
+        self.assertEqual(response.data[1], {})
+        self.assertIn("professional_id", response.data[2])
+        self.assertIn("scheduled_at", response.data[3])
+        self.assertIn("non_field_errors", response.data[4])  # existing appointment
+        self.assertIn("non_field_errors", response.data[5])  # repeated in the batch
+        self.assertEqual(Appointment.objects.count(), 1)
+
+    def test_bulk_create_appointments_rejects_scheduled_at_in_the_past(self):
+        yesterday = timezone.now() - datetime.timedelta(days=1)
+        items = [{"professional_id": self.professional.id, "scheduled_at": yesterday}]
+        response = self.client.post(self.url, items, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("scheduled_at", response.data[0])
+        self.assertEqual(Appointment.objects.count(), 1)
+
+    def test_bulk_create_appointments_rejects_non_list_body(self):
+        response = self.client.post(self.url, self.make_items(1)[0], format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("non_field_errors", response.data)
+
+        response = self.client.post(self.url, [], format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("non_field_errors", response.data)
+
+    def test_bulk_create_appointments_rejects_invalid_ndjson(self):
+        response = self.client.post(
+            self.url, '{"professional_id": 1}\n{', content_type="application/x-ndjson"
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Appointment.objects.count(), 1)
+
+    @mock.patch.object(AppointmentViewset, "bulk_max_size", 2)
+    def test_bulk_create_appointments_stops_reading_ndjson_past_max_size(self):
+        # The invalid line after the limit is never parsed
+        body = "\n".join(json.dumps(item) for item in self.make_items(3)) + "\n{"
+        response = self.client.post(self.url, body, content_type="application/x-ndjson")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data["non_field_errors"][0].code, "max_length")
+        self.assertEqual(Appointment.objects.count(), 1)
+
+    def test_unauthenticated_bulk_create_requires_auth(self):
+        self.client.credentials()
+        response = self.client.post(self.url, self.make_items(1), format="json")
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class AppointmentQueryBudgetTest(APITestCase):
+    """
+    Number of queries per endpoint, including the token authentication.
+    The budgets are documented in the README and must not grow with the
+    number of appointments.
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email="test@example.com", password="testpass"
+        )
+
+        self.token = Token.objects.get(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token.key}")
+
+        start = timezone.now() + datetime.timedelta(days=1)
+        for index in range(5):
+            professional = Professional.objects.create(
+                name=f"Profissional {index}",
+                profession=Professional.ProfessionChoices.GENERAL_PRACTITIONER,
+                street="Rua das Couves",
+                number="123",
+                neighborhood="Centro",
+                city="Rio de Janeiro",
+                state="RJ",
+                zipcode="12345678",
+                phone="2111112222",
+                email=f"profissional{index}@example.com",
+            )
+            Appointment.objects.bulk_create(
+                Appointment(
+                    professional=professional,
+                    scheduled_at=start + datetime.timedelta(hours=hour),
+                )
+                for hour in range(5)
+            )
+        self.professional = professional
+        self.appointment = Appointment.objects.first()
+
+    def test_list_appointments_query_budget(self):
+        # token, conditional GET fingerprint, count, page of appointments
+        # joined with their professionals
+        with self.assertNumQueries(4):
+            response = self.client.get(reverse("appointment-list"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["results"]), 20)
+
+    def test_retrieve_appointment_query_budget(self):
+        # token, appointment joined with its professional
+        url = reverse("appointment-detail", args=[self.appointment.id])
+        with self.assertNumQueries(2):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_create_appointment_query_budget(self):
+        # token, professional, savepoint, insert, release savepoint
+        data = {
+            "professional_id": self.professional.id,
+            "scheduled_at": (timezone.now() + datetime.timedelta(days=7)).isoformat(),
+        }
+        with self.assertNumQueries(5):
+            response = self.client.post(reverse("appointment-list"), data)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_appointment_str_does_not_need_extra_queries(self):
+        appointments = list(AppointmentViewset.queryset)
+        with self.assertNumQueries(0):
+            for appointment in appointments:
+                str(appointment)
+
+
+class AppointmentCursorPaginationTest(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email="test@example.com", password="testpass"
+        )
+
+        self.token = Token.objects.get(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token.key}")
+
+        self.professionals = [
+            Professional.objects.create(
+                name=f"Profissional {index}",
+                profession=Professional.ProfessionChoices.GENERAL_PRACTITIONER,
+                street="Rua das Couves",
+                number="123",
+                neighborhood="Centro",
+                city="Rio de Janeiro",
+                state="RJ",
+                zipcode="12345678",
+                phone="2111112222",
+                email=f"profissional{index}@example.com",
+            )
+            for index in range(3)
+        ]
+        self.start = timezone.now() + datetime.timedelta(days=1)
+        # Several professionals share the same times, so ties on
+        # scheduled_at must be broken by id.
+        Appointment.objects.bulk_create(
+            Appointment(
+                professional=professional,
+                scheduled_at=self.start + datetime.timedelta(hours=hour),
+            )
+            for hour in range(15)
+            for professional in self.professionals
+        )
+        self.url = reverse("appointment-list") + "?pagination=cursor"
+
+    def collect_ids(self, url):
+        ids = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            ids += [appointment["id"] for appointment in response.data["results"]]
+            url = response.data["next"]
+        return ids
+
+    def test_list_appointments_default_pagination_is_page_number(self):
+        response = self.client.get(reverse("appointment-list"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["count"], 45)
+
+    def test_cursor_pagination_walks_every_appointment_in_order(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn("count", response.data)
+        self.assertIsNone(response.data["previous"])
+        self.assertEqual(len(response.data["results"]), 20)
+
+        expected = list(
+            Appointment.objects.order_by("scheduled_at", "id").values_list(
+                "id", flat=True
+            )
+        )
+        self.assertEqual(self.collect_ids(self.url), expected)
+
+    def test_cursor_pagination_does_not_skip_or_repeat_rows_during_writes(self):
+        first_page = self.client.get(self.url)
+        first_ids = [item["id"] for item in first_page.data["results"]]
+
+        # Rows inserted before and after the cursor position while paginating
+        Appointment.objects.create(
+            professional=self.professionals[0],
+            scheduled_at=self.start - datetime.timedelta(hours=1),
+        )
+        later = Appointment.objects.create(
+            professional=self.professionals[0],
+            scheduled_at=self.start + datetime.timedelta(days=1),
+        )
+
+        remaining_ids = self.collect_ids(first_page.data["next"])
+        ids = first_ids + remaining_ids
+        self.assertEqual(len(ids), len(set(ids)))
+        self.assertEqual(len(ids), 46)
+        self.assertEqual(ids[-1], later.id)
+
+    def test_cursor_pagination_previous_link(self):
+        first_page = self.client.get(self.url)
+        second_page = self.client.get(first_page.data["next"])
+        previous_page = self.client.get(second_page.data["previous"])
+        self.assertEqual(previous_page.status_code, status.HTTP_200_OK)
+        self.assertEqual(previous_page.data["results"], first_page.data["results"])
+        self.assertIsNone(previous_page.data["previous"])
+
+    def test_cursor_pagination_keeps_filters(self):
+        professional = self.professionals[1]
+        url = self.url + f"&professional={professional.id}"
+        ids = self.collect_ids(url)
+        self.assertEqual(len(ids), 15)
+        self.assertEqual(
+            set(ids),
+            set(professional.appointments.values_list("id", flat=True)),
+        )
+
+    def test_cursor_pagination_deep_page_query_budget(self):
+        response = self.client.get(self.url)
+        response = self.client.get(response.data["next"])
+        # conditional GET fingerprint, page of appointments (no count, no
+        # offset); the token was cached by the previous pages
+        with self.assertNumQueries(2):
+            response = self.client.get(response.data["next"])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_cursor_pagination_with_sparse_fields(self):
+        response = self.client.get(
+            self.url, {"pagination": "cursor", "fields": "professional"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(list(response.data["results"][0]), ["professional"])
+        response = self.client.get(response.data["next"])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_cursor_pagination_rejects_invalid_cursor(self):
+        response = self.client.get(self.url + "&cursor=invalid")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class AppointmentCalendarTest(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email="test@example.com", password="testpass"
+        )
+
+        self.token = Token.objects.get(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token.key}")
+
+        self.professional_1, self.professional_2 = [
+            Professional.objects.create(
+                name=f"Profissional {index}",
+                profession=profession,
+                street="Rua das Couves",
+                number="123",
+                neighborhood="Centro",
+                city="Rio de Janeiro",
+                state="RJ",
+                zipcode="12345678",
+                phone="2111112222",
+                email=f"profissional{index}@example.com",
+            )
+            for index, profession in enumerate(["PEDIATRA", "DENTISTA"])
+        ]
+
+        today = timezone.localdate()
+        # A Monday far enough in the future for every appointment
+        self.monday = today + datetime.timedelta(days=14 - today.weekday())
+        self.url = reverse("appointment-calendar")
+
+        self.create_appointment(self.professional_1, 0, 9)
+        self.create_appointment(self.professional_1, 0, 10)
+        # 23:30 in São Paulo is already the next day in UTC
+        self.create_appointment(self.professional_1, 0, 23, 30)
+        self.create_appointment(self.professional_1, 8, 9)
+        self.create_appointment(self.professional_2, 2, 9)
+
+    def create_appointment(self, professional, days, hour, minute=0):
+        day = self.monday + datetime.timedelta(days=days)
+        scheduled_at = timezone.make_aware(
+            datetime.datetime.combine(day, datetime.time(hour, minute))
+        )
+        return Appointment.objects.create(
+            professional=professional, scheduled_at=scheduled_at
+        )
+
+    def test_calendar_counts_per_day(self):
+        params = {
+            "from": self.monday.isoformat(),
+            "to": (self.monday + datetime.timedelta(days=2)).isoformat(),
+        }
+        # token, grouped counts
+        with self.assertNumQueries(2):
+            response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["group_by"], "day")
+        self.assertEqual(
+            response.data["periods"],
+            [self.monday + datetime.timedelta(days=days) for days in range(3)],
+        )
+        self.assertEqual(
+            response.data["professionals"],
+            [self.professional_1.id, self.professional_2.id],
+        )
+        self.assertEqual(response.data["counts"], [[3, 0, 0], [0, 0, 1]])
+
+    def test_calendar_counts_per_week(self):
+        params = {
+            "from": (self.monday + datetime.timedelta(days=2)).isoformat(),
+            "to": (self.monday + datetime.timedelta(days=13)).isoformat(),
+            "group_by": "week",
+        }
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.data["periods"],
+            [self.monday, self.monday + datetime.timedelta(weeks=1)],
+        )
+        # Only appointments inside the requested days are counted
+        self.assertEqual(response.data["counts"], [[0, 1], [1, 0]])
+
+    def test_calendar_accepts_list_filters(self):
+        params = {
+            "from": self.monday.isoformat(),
+            "to": (self.monday + datetime.timedelta(days=13)).isoformat(),
+            "professional": self.professional_2.id,
+        }
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["professionals"], [self.professional_2.id])
+
+        params = {"from": self.monday.isoformat(), "profession": "PEDIATRA"}
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.data["professionals"], [self.professional_1.id])
+
+    def test_calendar_rejects_invalid_parameters(self):
+        response = self.client.get(self.url, {"group_by": "month"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("group_by", response.data)
+
+        response = self.client.get(
+            self.url,
+            {
+                "from": self.monday.isoformat(),
+                "to": (self.monday - datetime.timedelta(days=1)).isoformat(),
+            },
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("to", response.data)
+
+    def test_unauthenticated_calendar_requires_auth(self):
+        self.client.credentials()
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class AppointmentExportTest(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email="test@example.com", password="testpass"
+        )
+
+        self.token = Token.objects.get(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token.key}")
+
+        self.professional_1, self.professional_2 = [
+            Professional.objects.create(
+                name=f"Profissional {index}",
+                profession=profession,
+                street="Rua das Couves",
+                number="123",
+                neighborhood="Centro",
+                city="Rio de Janeiro",
+                state="RJ",
+                zipcode="12345678",
+                phone="2111112222",
+                email=f"profissional{index}@example.com",
+            )
+            for index, profession in enumerate(["PEDIATRA", "DENTISTA"])
+        ]
+        start = timezone.now() + datetime.timedelta(days=1)
+        Appointment.objects.bulk_create(
+            Appointment(
+                professional=professional,
+                scheduled_at=start + datetime.timedelta(hours=hour),
+            )
+            for hour in range(30)
+            for professional in [self.professional_1, self.professional_2]
+        )
+        self.url = reverse("appointment-export")
+
+    def read(self, response):
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        content = b"".join(response.streaming_content)
+        if response.get("Content-Encoding") == "gzip":
+            content = gzip.decompress(content)
+        return content.decode()
+
+    def test_export_appointments_as_ndjson(self):
+        response = self.client.get(self.url)
+        self.assertTrue(response.streaming)
+        self.assertTrue(response["Content-Type"].startswith("application/x-ndjson"))
+        lines = self.read(response).splitlines()
+        self.assertEqual(len(lines), 60)
+
+        item = json.loads(lines[0])
+        first = Appointment.objects.first()
+        self.assertEqual(item["id"], first.id)
+        self.assertEqual(item["professional_name"], first.professional.name)
+        self.assertEqual(
+            item["scheduled_at"], timezone.localtime(first.scheduled_at).isoformat()
+        )
+
+    def test_export_appointments_as_csv(self):
+        response = self.client.get(self.url, {"output": "csv"})
+        self.assertTrue(response["Content-Type"].startswith("text/csv"))
+        rows = list(csv.reader(io.StringIO(self.read(response))))
+        self.assertEqual(rows[0][:3], ["id", "professional_id", "professional_name"])
+        self.assertEqual(len(rows), 61)
+
+    def test_export_appointments_with_gzip(self):
+        response = self.client.get(self.url, HTTP_ACCEPT_ENCODING="gzip, deflate")
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(len(self.read(response).splitlines()), 60)
+
+    def test_export_appointments_uses_list_filters(self):
+        response = self.client.get(self.url, {"profession": "DENTISTA"})
+        lines = self.read(response).splitlines()
+        self.assertEqual(len(lines), 30)
+        self.assertTrue(
+            all(
+                json.loads(line)["professional_id"] == self.professional_2.id
+                for line in lines
+            )
+        )
+
+    def test_export_appointments_rejects_invalid_output(self):
+        response = self.client.get(self.url, {"output": "xml"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_unauthenticated_export_requires_auth(self):
+        self.client.credentials()
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_export_streams_under_asgi(self):
+        # Like the test client, keep the connection of the test transaction
+        for signal in [request_started, request_finished]:
+            signal.disconnect(close_old_connections)
+            self.addCleanup(signal.connect, close_old_connections)
+
+        events = []
+        batched = ExportMixin.batched
+
+        def record_batches(view, rows):
+            for chunk in batched(view, rows):
+                events.append("batch")
+                yield chunk
+
+        requests = [{"type": "http.request"}]
+
+        async def receive():
+            if requests:
+                return requests.pop()
+            # No disconnect: wait until the handler cancels the listener
+            await asyncio.Event().wait()
+
+        messages = []
+
+        async def send(message):
+            if message.get("body"):
+                events.append("body")
+            messages.append(message)
+
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "GET",
+            "scheme": "http",
+            "path": self.url,
+            "query_string": b"",
+            "headers": [
+                (b"host", b"testserver"),
+                (b"authorization", f"Token {self.token.key}".encode()),
+            ],
+        }
+        with (
+            mock.patch.object(AppointmentViewset, "export_chunk_size", 10),
+            mock.patch.object(ExportMixin, "batched", record_batches),
+        ):
+            async_to_sync(ASGIHandler())(scope, receive, send)
+
+        self.assertEqual(messages[0]["status"], status.HTTP_200_OK)
+        body = b"".join(message.get("body", b"") for message in messages[1:])
+        self.assertEqual(len(body.decode().splitlines()), 60)
+        # Each batch is sent before the next one is read from the cursor
+        self.assertEqual(events, ["batch", "body"] * 6)
+
+
+class AppointmentConditionalGetTest(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email="test@example.com", password="testpass"
+        )
+
+        self.token = Token.objects.get(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token.key}")
+
+        self.professional = Professional.objects.create(
+            name="Alice dos Santos",
+            profession=Professional.ProfessionChoices.GENERAL_PRACTITIONER,
+            street="Rua das Couves",
+            number="123",
+            complement="Ap. 4",
+            neighborhood="Centro",
+            city="Rio de Janeiro",
+            state="RJ",
+            zipcode="12345678",
+            phone="2111112222",
+            email="alice@example.com",
+        )
+        self.time = timezone.now() + datetime.timedelta(days=1)
+        self.appointment = Appointment.objects.create(
+            professional=self.professional, scheduled_at=self.time
+        )
+
+        self.list_url = reverse("appointment-list")
+        self.detail_url = reverse("appointment-detail", args=[self.appointment.id])
+
+    def test_retrieve_appointment_not_modified(self):
+        response = self.client.get(self.detail_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        etag = response["ETag"]
+        self.assertIn("Last-Modified", response)
+
+        with mock.patch.object(
+            AppointmentSerializer, "to_representation", side_effect=AssertionError
+        ):
+            response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response["ETag"], etag)
+        self.assertEqual(response.content, b"")
+
+    def test_retrieve_appointment_modified_after_change(self):
+        etag = self.client.get(self.detail_url)["ETag"]
+
+        self.client.patch(
+            self.detail_url,
+            {"scheduled_at": (self.time + datetime.timedelta(hours=1)).isoformat()},
+        )
+        response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_retrieve_appointment_modified_after_professional_change(self):
+        etag = self.client.get(self.detail_url)["ETag"]
+
+        self.professional.name = "Alice Souza"
+        self.professional.save()
+        response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["professional"]["name"], "Alice Souza")
+
+    def test_retrieve_appointment_if_modified_since(self):
+        last_modified = self.client.get(self.detail_url)["Last-Modified"]
+        response = self.client.get(
+            self.detail_url, HTTP_IF_MODIFIED_SINCE=last_modified
+        )
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_list_appointments_not_modified(self):
+        etag = self.client.get(self.list_url)["ETag"]
+
+        # conditional GET fingerprint (the token is cached)
+        with self.assertNumQueries(1):
+            response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        # Each page and filter has its own ETag
+        response = self.client.get(
+            self.list_url,
+            {"professional": self.professional.id},
+            HTTP_IF_NONE_MATCH=etag,
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_list_appointments_modified_after_create_and_delete(self):
+        etag = self.client.get(self.list_url)["ETag"]
+
+        other = Appointment.objects.create(
+            professional=self.professional,
+            scheduled_at=self.time + datetime.timedelta(hours=1),
+        )
+        response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["results"]), 2)
+
+        etag = response["ETag"]
+        other.delete()
+        response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["results"]), 1)
+
+    def test_list_appointments_has_no_last_modified(self):
+        # A deletion doesn't move MAX(updated_at): only the ETag can tell
+        response = self.client.get(self.list_url)
+        self.assertIn("ETag", response)
+        self.assertNotIn("Last-Modified", response)
+
+        other = Appointment.objects.create(
+            professional=self.professional,
+            scheduled_at=self.time + datetime.timedelta(hours=1),
+        )
+        last_modified = self.client.get(self.detail_url)["Last-Modified"]
+        other.delete()
+        response = self.client.get(self.list_url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+@override_settings(ROOT_URLCONF="config.async_urls")
+class AppointmentAsyncReadTest(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email="test@example.com", password="testpass"
+        )
+
+        self.token = Token.objects.get(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token.key}")
+
+        self.professional = Professional.objects.create(
+            name="Alice dos Santos",
+            profession=Professional.ProfessionChoices.GENERAL_PRACTITIONER,
+            street="Rua das Couves",
+            number="123",
+            neighborhood="Centro",
+            city="Rio de Janeiro",
+            state="RJ",
+            zipcode="12345678",
+            phone="2111112222",
+            email="alice@example.com",
+        )
+        start = timezone.now() + datetime.timedelta(days=1)
+        self.appointments = Appointment.objects.bulk_create(
+            Appointment(
+                professional=self.professional,
+                scheduled_at=start + datetime.timedelta(hours=hour),
+            )
+            for hour in range(25)
+        )
+        self.list_url = reverse("appointment-list")
+
+    def get_sync(self, url):
+        with override_settings(ROOT_URLCONF="config.urls"):
+            return self.client.get(url)
+
+    def test_async_responses_match_the_sync_views(self):
+        urls = [
+            self.list_url,
+            self.list_url + "?page=2",
+            self.list_url + "?pagination=cursor",
+            reverse("appointment-detail", args=[self.appointments[0].id]),
+        ]
+        for url in urls:
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                self.assertEqual(response.content, self.get_sync(url).content)
+
+    def test_async_cursor_pagination_walks_every_appointment(self):
+        ids = []
+        url = self.list_url + "?pagination=cursor"
+        while url:
+            data = self.client.get(url).json()
+            ids.extend(appointment["id"] for appointment in data["results"])
+            url = data["next"]
+        self.assertEqual(ids, [appointment.id for appointment in self.appointments])
+
+    def test_async_list_not_modified(self):
+        response = self.client.get(self.list_url)
+        self.assertNotIn("Last-Modified", response)
+        response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_async_invalid_cursor(self):
+        response = self.client.get(self.list_url + "?cursor=invalid")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
@@ -1,14 +1,140 @@
+import datetime
+
+from django.db.models import Count, DateField
+from django.db.models.functions import TruncDate, TruncWeek
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework import viewsets
+from rest_framework import status, viewsets
+from rest_framework.decorators import action
+from rest_framework.parsers import JSONParser
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from config.asynchronous import AsyncReadMixin
+from config.conditional import ConditionalGetMixin
+from config.exports import ExportMixin
+from config.values import ValuesReadMixin
 
+from .filters import AppointmentFilter
 from .models import Appointment
-from .serializers import AppointmentSerializer
+from .pagination import AppointmentPagination
+from .parsers import NDJSONParser
+from .serializers import (
+    AppointmentBulkItemSerializer,
+    AppointmentSerializer,
+    CalendarQuerySerializer,
+)
 
 
-class AppointmentViewset(viewsets.ModelViewSet):
+class AppointmentViewset(
+    ConditionalGetMixin,
+    ExportMixin,
+    AsyncReadMixin,
+    ValuesReadMixin,
+    viewsets.ModelViewSet,
+):
     permission_classes = [IsAuthenticated]
     serializer_class = AppointmentSerializer
-    queryset = Appointment.objects.all()
+    queryset = AppointmentSerializer.setup_eager_loading(Appointment.objects.all())
     filter_backends = [DjangoFilterBackend]
-    filterset_fields = ["professional"]
+    filterset_class = AppointmentFilter
+    pagination_class = AppointmentPagination
+    last_modified_fields = ["updated_at", "professional__updated_at"]
+    # Position of the keyset pagination, read from the rows
+    values_lookups = ["scheduled_at", "id"]
+    bulk_max_size = 1000
+    export_fields = {
+        "id": "id",
+        "professional_id": "professional_id",
+        "professional_name": "professional__name",
+        "profession": "professional__profession",
+        "scheduled_at": "scheduled_at",
+        "created_at": "created_at",
+        "updated_at": "updated_at",
+    }
+
+    @action(
+        detail=False,
+        methods=["post"],
+        parser_classes=[JSONParser, NDJSONParser],
+        serializer_class=AppointmentBulkItemSerializer,
+    )
+    def bulk(self, request):
+        """
+        Create a list of appointments in a single transaction.
+
+        Accepts a JSON list or newline delimited JSON. If any item is invalid,
+        nothing is created and the errors are returned aligned with the input.
+        """
+        serializer = AppointmentBulkItemSerializer(
+            data=request.data, many=True, max_length=self.bulk_max_size
+        )
+        serializer.is_valid(raise_exception=True)
+        appointments = serializer.save()
+        data = AppointmentSerializer(appointments, many=True).data
+        return Response(data, status=status.HTTP_201_CREATED)
+
+    @action(detail=False, methods=["get"], serializer_class=CalendarQuerySerializer)
+    def calendar(self, request):
+        """
+        Count appointments per professional per day (or week) in the server
+        timezone, with a single GROUP BY query.
+
+        Accepts the same filters as the list. Returns a matrix with one row
+        per professional and one column per period; periods without
+        appointments are returned as zero.
+        """
+        query = CalendarQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        start, end, group_by = (
+            query.validated_data["from"],
+            query.validated_data["to"],
+            query.validated_data["group_by"],
+        )
+
+        if group_by == "week":
+            period = TruncWeek("scheduled_at", output_field=DateField())
+            first_period = start - datetime.timedelta(days=start.weekday())
+            step = datetime.timedelta(weeks=1)
+        else:
+            period = TruncDate("scheduled_at")
+            first_period = start
+            step = datetime.timedelta(days=1)
+
+        periods = []
+        current = first_period
+        while current <= end:
+            periods.append(current)
+            current += step
+
+        rows = (
+            self.filter_queryset(Appointment.objects.all())
+            .filter(
+                scheduled_at__gte=query.validated_data["start_at"],
+                scheduled_at__lt=query.validated_data["end_at"],
+            )
+            .annotate(period=period)
+            .values("professional_id", "period")
+            .annotate(count=Count("id"))
+            .order_by()
+            .values_list("professional_id", "period", "count")
+        )
+
+        period_index = {value: index for index, value in enumerate(periods)}
+        counts = {}
+        for professional_id, value, count in rows:
+            row = counts.setdefault(professional_id, [0] * len(periods))
+            row[period_index[value]] = count
+
+        professionals = sorted(counts)
+        return Response(
+            {
+                "group_by": group_by,
+                "from": start,
+                "to": end,
+                "periods": periods,
+                "professionals": professionals,
+                "counts": [
+                    counts[professional_id] for professional_id in professionals
+                ],
+            }
+        )
@@ -12,5 +12,9 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+# Tell the settings they are served under ASGI (see `CONN_MAX_AGE`).
+os.environ["ASGI"] = "1"
+# List and retrieve of professionals and appointments are async views.
+os.environ.setdefault("ASYNC_READS", "1")
 
 application = get_asgi_application()
@@ -0,0 +1,11 @@
+"""
+URL configuration of ASGI deployments (`ASYNC_READS=1`).
+
+The same routes as `config.urls`, but list and retrieve of professionals
+and appointments are served by async views (see `config.asynchronous`).
+"""
+
+from .asynchronous import AsyncReadRouter
+from .urls import get_urlpatterns
+
+urlpatterns = get_urlpatterns(AsyncReadRouter())
@@ -0,0 +1,146 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.core.paginator import InvalidPage
+from django.urls import URLPattern
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import routers
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import PageNumberPagination
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+
+class AsyncPageNumberPagination(PageNumberPagination):
+    """
+    `PageNumberPagination` that can also paginate on the async read path,
+    counting and fetching the page with the async ORM.
+    """
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+
+        paginator = self.django_paginator_class(queryset, page_size)
+        # `count` is a cached property: fill it before the paginator reads it.
+        paginator.count = await queryset.acount()
+        page_number = self.get_page_number(request, paginator)
+        try:
+            self.page = paginator.page(page_number)
+        except InvalidPage as exc:
+            msg = self.invalid_page_message.format(
+                page_number=page_number, message=str(exc)
+            )
+            raise NotFound(msg)
+        self.page.object_list = [row async for row in self.page.object_list]
+
+        if paginator.num_pages > 1 and self.template is not None:
+            self.display_page_controls = True
+        return list(self.page)
+
+
+class AsyncReadMixin:
+    """
+    Serve list and retrieve from an async view, built with `as_async_view`.
+
+    Authentication, permissions and throttling run in a thread, as they may
+    query the database; the handlers (`alist`, `aretrieve`, see
+    `ValuesReadMixin`) fetch the rows with the async ORM, so a slow query
+    doesn't hold a worker under ASGI. Every other action is delegated to
+    the sync view.
+    """
+
+    async_actions = ("list", "retrieve")
+
+    @classmethod
+    def as_async_view(cls, actions, **initkwargs):
+        """Async counterpart of the router's `as_view(actions)`."""
+        sync_view = cls.as_view(actions, **initkwargs)
+        actions = dict(actions)
+        if "get" in actions and "head" not in actions:
+            actions["head"] = actions["get"]
+
+        async def view(request, *args, **kwargs):
+            if actions.get(request.method.lower()) not in cls.async_actions:
+                return await sync_to_async(sync_view)(request, *args, **kwargs)
+
+            self = cls(**initkwargs)
+            self.action_map = actions
+            return await self.adispatch(request, *args, **kwargs)
+
+        view.cls = cls
+        view.initkwargs = initkwargs
+        view.actions = actions
+        return csrf_exempt(view)
+
+    async def adispatch(self, request, *args, **kwargs):
+        """`dispatch` awaiting the `a<action>` handler."""
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+            handler = getattr(self, f"a{self.action}")
+            response = await handler(request, *args, **kwargs)
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+
+class AsyncReadRouter(routers.DefaultRouter):
+    """
+    `DefaultRouter` routing list and retrieve of `AsyncReadMixin` viewsets
+    to their async views.
+    """
+
+    def get_urls(self):
+        urls = []
+        for url in super().get_urls():
+            cls = getattr(url.callback, "cls", None)
+            actions = getattr(url.callback, "actions", {})
+            if (
+                isinstance(cls, type)
+                and issubclass(cls, AsyncReadMixin)
+                and set(actions.values()) & set(cls.async_actions)
+            ):
+                view = cls.as_async_view(actions, **url.callback.initkwargs)
+                url = URLPattern(url.pattern, view, url.default_args, url.name)
+            urls.append(url)
+        return urls
+
+
+class AsyncWhiteNoiseMiddleware(WhiteNoiseMiddleware):
+    """
+    `WhiteNoiseMiddleware` that can also run in an async middleware chain.
+
+    WhiteNoise's middleware is sync only: under ASGI, Django would run it,
+    and the whole request below it, in a thread. Static files are still
+    served from a thread, as opening them blocks.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response=None, *args, **kwargs):
+        super().__init__(get_response, *args, **kwargs)
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        if self.autorefresh:
+            static_file = await sync_to_async(self.find_file)(request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is not None:
+            return await sync_to_async(self.serve)(static_file, request)
+        return await self.get_response(request)
@@ -0,0 +1,199 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.utils.cache import get_conditional_response
+from django.utils.http import parse_http_date_safe
+from rest_framework.response import Response
+
+from .conditional import ConditionalGetMixin
+
+
+def get_version(key):
+    """
+    Return the current version stored at `key`.
+
+    A missing version (never set or evicted) starts from the current time,
+    so entries cached under an older version can never be served again.
+    """
+    return cache.get_or_set(key, time.time_ns, timeout=None)
+
+
+def bump_version(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), timeout=None)
+
+
+def increment(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 1, timeout=None)
+
+
+def list_version_key(prefix):
+    return f"{prefix}:version:list"
+
+
+def detail_version_key(prefix, pk):
+    return f"{prefix}:version:detail:{pk}"
+
+
+def invalidate_cache(prefix, *pks):
+    """
+    Invalidate every list page cached under `prefix`, and the detail of
+    each object in `pks`.
+    """
+    bump_version(list_version_key(prefix))
+    for pk in pks:
+        bump_version(detail_version_key(prefix, pk))
+
+
+async def aget_version(key):
+    return await cache.aget_or_set(key, time.time_ns, timeout=None)
+
+
+async def aincrement(key):
+    try:
+        await cache.aincr(key)
+    except ValueError:
+        await cache.aadd(key, 1, timeout=None)
+
+
+class CachedResponseMixin(ConditionalGetMixin):
+    """
+    Cache list and detail responses, keyed by URL (query params included)
+    and negotiated media type. The cached responses keep the validators of
+    `ConditionalGetMixin`, and its `is_cacheable` also decides what is
+    cached.
+
+    Keys embed a version number: one shared by every list page and one per
+    object. `invalidate_cache(cache_prefix, pk)` bumps the list version and
+    the version of the changed object, so stale entries are never read again
+    and simply expire. Hits and misses are counted in the cache, shared by
+    every worker.
+
+    Nothing is cached unless `settings.CACHE_RESPONSES` is set, which
+    requires a cache shared by every worker.
+    """
+
+    cache_prefix = None
+    cache_timeout = DEFAULT_TIMEOUT
+
+    def list(self, request, *args, **kwargs):
+        version = get_version(list_version_key(self.cache_prefix))
+        return self.cached_response(
+            request,
+            f"list:{version}",
+            lambda: super(CachedResponseMixin, self).list(request, *args, **kwargs),
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        pk = self.kwargs[self.lookup_url_kwarg or self.lookup_field]
+        version = get_version(detail_version_key(self.cache_prefix, pk))
+        return self.cached_response(
+            request,
+            f"detail:{pk}:{version}",
+            lambda: super(CachedResponseMixin, self).retrieve(request, *args, **kwargs),
+        )
+
+    async def alist(self, request, *args, **kwargs):
+        version = await aget_version(list_version_key(self.cache_prefix))
+        return await self.acached_response(
+            request,
+            f"list:{version}",
+            lambda: super(CachedResponseMixin, self).alist(request, *args, **kwargs),
+        )
+
+    async def aretrieve(self, request, *args, **kwargs):
+        pk = self.kwargs[self.lookup_url_kwarg or self.lookup_field]
+        version = await aget_version(detail_version_key(self.cache_prefix, pk))
+        return await self.acached_response(
+            request,
+            f"detail:{pk}:{version}",
+            lambda: super(CachedResponseMixin, self).aretrieve(
+                request, *args, **kwargs
+            ),
+        )
+
+    def cached_response(self, request, scope, render):
+        if not (settings.CACHE_RESPONSES and self.is_cacheable(request)):
+            return render()
+
+        key = self.cache_key(request, scope)
+        entry = cache.get(key)
+        if entry is None:
+            increment(self.stats_key("misses"))
+            response = render()
+            if response.status_code == 200:
+                cache.set(key, self.make_cache_entry(response), self.cache_timeout)
+            response["X-Cache"] = "MISS"
+            return response
+
+        increment(self.stats_key("hits"))
+        return self.cache_entry_response(request, entry)
+
+    async def acached_response(self, request, scope, render):
+        """`cached_response` for the async read path: `render` is awaited."""
+        if not (settings.CACHE_RESPONSES and self.is_cacheable(request)):
+            return await render()
+
+        key = self.cache_key(request, scope)
+        entry = await cache.aget(key)
+        if entry is None:
+            await aincrement(self.stats_key("misses"))
+            response = await render()
+            if response.status_code == 200:
+                await cache.aset(
+                    key, self.make_cache_entry(response), self.cache_timeout
+                )
+            response["X-Cache"] = "MISS"
+            return response
+
+        await aincrement(self.stats_key("hits"))
+        return self.cache_entry_response(request, entry)
+
+    def cache_key(self, request, scope):
+        accepted = getattr(request, "accepted_media_type", "")
+        return f"{self.cache_prefix}:{scope}:{accepted}:{request.get_full_path()}"
+
+    @staticmethod
+    def make_cache_entry(response):
+        headers = {
+            header: response[header]
+            for header in ("ETag", "Last-Modified")
+            if header in response
+        }
+        return {"data": response.data, "headers": headers}
+
+    @staticmethod
+    def cache_entry_response(request, entry):
+        headers = entry["headers"]
+        last_modified = parse_http_date_safe(headers.get("Last-Modified", ""))
+        response = get_conditional_response(
+            request, etag=headers.get("ETag"), last_modified=last_modified
+        )
+        if response is None:
+            response = Response(entry["data"])
+        for header, value in headers.items():
+            response[header] = value
+        response["X-Cache"] = "HIT"
+        return response
+
+    @classmethod
+    def stats_key(cls, name):
+        return f"{cls.cache_prefix}:stats:{name}"
+
+    @classmethod
+    def get_cache_stats(cls):
+        hits = cache.get(cls.stats_key("hits"), 0)
+        misses = cache.get(cls.stats_key("misses"), 0)
+        total = hits + misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_ratio": round(hits / total, 4) if total else None,
+        }
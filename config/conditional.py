@@ -0,0 +1,172 @@
+import hashlib
+
+from asgiref.sync import sync_to_async
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from rest_framework.response import Response
+
+
+class ConditionalGetMixin:
+    """
+    Answer list and detail GETs with ETag / Last-Modified validators and
+    return `304 Not Modified` before running the serializer when the client
+    copy is still fresh.
+
+    Detail validators come from the `last_modified_fields` of the object.
+    The list validator is an ETag built from a single aggregate over the
+    filtered queryset (row count plus the latest modification), so
+    deletions and updates both change it. Lists send no Last-Modified: a
+    deletion doesn't move the latest modification, so `If-Modified-Since`
+    would answer 304 for a list that lost rows.
+    """
+
+    # Lookups that change whenever the rendered representation changes,
+    # including the ones of nested objects.
+    last_modified_fields = ["updated_at"]
+
+    def list(self, request, *args, **kwargs):
+        if not self.is_cacheable(request):
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.filter_queryset(self.get_queryset())
+        fingerprint = queryset.order_by().aggregate(**self.fingerprint_aggregates())
+        count, last_modified = self.read_fingerprint(fingerprint)
+        return self.conditional_response(
+            request,
+            [count, last_modified],
+            None,
+            lambda: super(ConditionalGetMixin, self).list(request, *args, **kwargs),
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        last_modified = self.latest(
+            self.resolve(instance, field) for field in self.last_modified_fields
+        )
+
+        def render():
+            serializer = self.get_serializer(instance)
+            return Response(serializer.data)
+
+        return self.conditional_response(
+            request,
+            [self.resolve(instance, "pk"), last_modified],
+            last_modified,
+            render,
+        )
+
+    async def alist(self, request, *args, **kwargs):
+        if not self.is_cacheable(request):
+            return await super().alist(request, *args, **kwargs)
+
+        queryset = await sync_to_async(self.filter_queryset)(self.get_queryset())
+        fingerprint = await queryset.order_by().aaggregate(
+            **self.fingerprint_aggregates()
+        )
+        count, last_modified = self.read_fingerprint(fingerprint)
+        return await self.aconditional_response(
+            request,
+            [count, last_modified],
+            None,
+            lambda: super(ConditionalGetMixin, self).alist(request, *args, **kwargs),
+        )
+
+    async def aretrieve(self, request, *args, **kwargs):
+        instance = await self.aget_object()
+        last_modified = self.latest(
+            self.resolve(instance, field) for field in self.last_modified_fields
+        )
+
+        async def render():
+            serializer = self.get_serializer(instance)
+            return Response(await serializer.adata())
+
+        return await self.aconditional_response(
+            request,
+            [self.resolve(instance, "pk"), last_modified],
+            last_modified,
+            render,
+        )
+
+    def fingerprint_aggregates(self):
+        return {
+            "count": Count("pk"),
+            **{
+                f"last_modified_{index}": Max(field)
+                for index, field in enumerate(self.last_modified_fields)
+            },
+        }
+
+    def read_fingerprint(self, fingerprint):
+        """Return the row count and the latest modification of the list."""
+        count = fingerprint.pop("count")
+        return count, self.latest(fingerprint.values())
+
+    def conditional_response(self, request, validators, last_modified, render):
+        """
+        Return a 304 if the request validators match, otherwise call `render`.
+        Both responses carry the ETag header, and the Last-Modified header
+        when `last_modified` is given.
+        """
+        if not self.is_cacheable(request):
+            return render()
+
+        etag, timestamp = self.make_validators(request, validators, last_modified)
+        response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+        if response is None:
+            response = render()
+        return self.add_validators(response, etag, timestamp)
+
+    async def aconditional_response(self, request, validators, last_modified, render):
+        """`conditional_response` for the async read path: `render` is awaited."""
+        if not self.is_cacheable(request):
+            return await render()
+
+        etag, timestamp = self.make_validators(request, validators, last_modified)
+        response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+        if response is None:
+            response = await render()
+        return self.add_validators(response, etag, timestamp)
+
+    def make_validators(self, request, validators, last_modified):
+        etag = self.make_etag(request, validators)
+        timestamp = int(last_modified.timestamp()) if last_modified else None
+        return etag, timestamp
+
+    @staticmethod
+    def add_validators(response, etag, timestamp):
+        if response.status_code in (200, 304):
+            response["ETag"] = etag
+            if timestamp is not None:
+                response["Last-Modified"] = http_date(timestamp)
+        return response
+
+    def is_cacheable(self, request):
+        """
+        Whether the response only changes with the `last_modified_fields`,
+        so it can be validated (and cached, see `CachedResponseMixin`).
+        """
+        return True
+
+    def make_etag(self, request, validators):
+        # The representation also depends on the URL (page, filters) and on
+        # the negotiated renderer (JSON or browsable API).
+        accepted = getattr(request, "accepted_media_type", "")
+        key = "|".join(
+            [request.get_full_path(), accepted, *(str(value) for value in validators)]
+        )
+        return quote_etag(hashlib.sha1(key.encode()).hexdigest())
+
+    @staticmethod
+    def latest(values):
+        values = [value for value in values if value is not None]
+        return max(values) if values else None
+
+    @staticmethod
+    def resolve(instance, field):
+        if isinstance(instance, dict):  # `.values()` row
+            return instance[field]
+        for attribute in field.split("__"):
+            instance = getattr(instance, attribute)
+        return instance
@@ -0,0 +1,40 @@
+from django.db import connection
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+
+POOL_COUNTERS = [
+    "requests_num",
+    "requests_queued",
+    "requests_wait_ms",
+    "requests_errors",
+]
+
+
+def get_pool_stats():
+    """
+    Return the counters of the connection pool of this process, or None
+    when pooling is disabled.
+
+    `requests_wait_ms` is the total time spent waiting for a connection and
+    `requests_errors` counts the requests that failed, mostly on timeout.
+    """
+    pool = connection.pool
+    if pool is None:
+        return None
+    stats = pool.get_stats()
+    # psycopg_pool leaves out the counters that are still zero
+    for key in POOL_COUNTERS:
+        stats.setdefault(key, 0)
+    stats["connections_in_use"] = stats["pool_size"] - stats["pool_available"]
+    return stats
+
+
+@api_view(["GET"])
+@permission_classes([IsAdminUser])
+def pool_stats(request):
+    """Counters of the database connection pool of the worker serving it."""
+    stats = get_pool_stats()
+    if stats is None:
+        return Response({"enabled": False})
+    return Response({"enabled": True, **stats})
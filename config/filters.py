@@ -0,0 +1,29 @@
+from django_filters import utils
+from django_filters.rest_framework import DjangoFilterBackend
+
+
+class PerRequestFilterBackend(DjangoFilterBackend):
+    """
+    `DjangoFilterBackend` building the filterset once per view instance,
+    that is once per request.
+
+    Views filter their queryset more than once per request (fingerprint,
+    count and page), so what a filter method keeps on the filterset is
+    computed only once. Each queryset is still filtered on its own.
+    """
+
+    def get_filterset(self, request, queryset, view):
+        filterset = getattr(view, "_filterset", None)
+        if filterset is None:
+            filterset = super().get_filterset(request, queryset, view)
+            view._filterset = filterset
+        return filterset
+
+    def filter_queryset(self, request, queryset, view):
+        filterset = self.get_filterset(request, queryset, view)
+        if filterset is None:
+            return queryset
+
+        if not filterset.is_valid() and self.raise_exception:
+            raise utils.translate_validation(filterset.errors)
+        return filterset.filter_queryset(queryset.all())
@@ -47,6 +47,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     "rest_framework",
     "rest_framework.authtoken",
     "django_filters",
@@ -59,7 +60,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
-    "whitenoise.middleware.WhiteNoiseMiddleware",
+    "config.asynchronous.AsyncWhiteNoiseMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -67,9 +68,18 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "config.throttling.RateLimitHeadersMiddleware",
 ]
 
-ROOT_URLCONF = "config.urls"
+# Serve list and retrieve of professionals and appointments with async views.
+# Set ASYNC_READS=1 when running under ASGI (see config/asgi.py).
+ASYNC_READS = os.environ.get("ASYNC_READS", "0") == "1"
+
+# Whether this process serves `config.asgi`, which sets ASGI=1 before the
+# settings are loaded, regardless of ASYNC_READS.
+ASGI = os.environ.get("ASGI", "0") == "1"
+
+ROOT_URLCONF = "config.async_urls" if ASYNC_READS else "config.urls"
 
 TEMPLATES = [
     {
@@ -103,16 +113,93 @@ DATABASES = {
     }
 }
 
+# Connection pool (psycopg_pool), one per worker process: up to
+# POSTGRES_POOL_MAX_SIZE connections each. POSTGRES_POOL_TIMEOUT is how long
+# a request waits for a free connection before failing. Without the pool,
+# connections are kept open for POSTGRES_CONN_MAX_AGE seconds instead, under
+# WSGI only: under ASGI each request runs in its own thread, whose persistent
+# connection would never be reused nor closed.
+POSTGRES_POOL = os.environ.get("POSTGRES_POOL", "1") == "1"
+
+if POSTGRES_POOL:
+    DATABASES["default"]["OPTIONS"] = {
+        "pool": {
+            "min_size": int(os.environ.get("POSTGRES_POOL_MIN_SIZE", 2)),
+            "max_size": int(os.environ.get("POSTGRES_POOL_MAX_SIZE", 10)),
+            "timeout": float(os.environ.get("POSTGRES_POOL_TIMEOUT", 10)),
+            "max_idle": float(os.environ.get("POSTGRES_POOL_MAX_IDLE", 600)),
+            "max_lifetime": float(os.environ.get("POSTGRES_POOL_MAX_LIFETIME", 3600)),
+        }
+    }
+elif ASGI:
+    DATABASES["default"]["CONN_MAX_AGE"] = 0
+else:
+    DATABASES["default"]["CONN_MAX_AGE"] = int(
+        os.environ.get("POSTGRES_CONN_MAX_AGE", 60)
+    )
+
+# Check each connection before it is used. With the pool, Django passes
+# `ConnectionPool.check_connection` to psycopg_pool as its `check`.
+DATABASES["default"]["CONN_HEALTH_CHECKS"] = True
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# Local memory by default. Set CACHE_URL (e.g. redis://host:6379/0) to share
+# the cache and the throttle buckets between workers through Redis.
+
+CACHE_URL = os.environ.get("CACHE_URL", "")
+CACHE_TIMEOUT = int(os.environ.get("CACHE_TIMEOUT", 300))
+
+if CACHE_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": CACHE_URL,
+            "TIMEOUT": CACHE_TIMEOUT,
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "TIMEOUT": CACHE_TIMEOUT,
+        }
+    }
+
+# Responses are only cached with a shared backend: with a cache local to each
+# worker, a write invalidates the copies of the worker serving it, and the
+# other workers keep serving stale responses until they expire.
+CACHE_RESPONSES = bool(CACHE_URL)
+
+# Token authentication cache, local to each process. Revocations made in
+# another process are seen after TOKEN_CACHE_TTL seconds.
+TOKEN_CACHE_SIZE = int(os.environ.get("TOKEN_CACHE_SIZE", 1024))
+TOKEN_CACHE_TTL = int(os.environ.get("TOKEN_CACHE_TTL", 60))
+
+# Token bucket rates ("<requests>/<s|min|hour|day>"): per token, and per
+# token and route. Buckets live in Redis when CACHE_URL is set, otherwise
+# in the memory of each worker.
+THROTTLE_TOKEN_RATE = os.environ.get("THROTTLE_TOKEN_RATE", "1200/min")
+THROTTLE_ENDPOINT_RATE = os.environ.get("THROTTLE_ENDPOINT_RATE", "300/min")
+
 AUTH_USER_MODEL = "accounts.User"
 
 REST_FRAMEWORK = {
-    "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
+    "DEFAULT_PAGINATION_CLASS": "config.asynchronous.AsyncPageNumberPagination",
     "PAGE_SIZE": 20,
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework.authentication.TokenAuthentication",
+        "accounts.authentication.CachedTokenAuthentication",
         "rest_framework.authentication.SessionAuthentication",
     ],
-    "DEFAULT_FILTER_BACKENDS": ["django_filters.rest_framework.DjangoFilterBackend"],
+    "DEFAULT_THROTTLE_CLASSES": [
+        "config.throttling.TokenRateThrottle",
+        "config.throttling.EndpointRateThrottle",
+    ],
+    "DEFAULT_THROTTLE_RATES": {
+        "token": THROTTLE_TOKEN_RATE,
+        "endpoint": THROTTLE_ENDPOINT_RATE,
+    },
+    "DEFAULT_FILTER_BACKENDS": ["config.filters.PerRequestFilterBackend"],
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
 }
 
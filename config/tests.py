@@ -0,0 +1,248 @@
+import os
+import subprocess
+import sys
+import time
+from unittest import mock
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache.backends.redis import RedisCache
+from django.core.handlers.asgi import ASGIHandler
+from django.db import connection
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory, APITestCase
+
+from professionals.models import Professional
+from professionals.views import ProfessionalViewSet
+
+from .asynchronous import AsyncWhiteNoiseMiddleware
+from .filters import PerRequestFilterBackend
+from .throttling import (
+    TAKE_SCRIPT,
+    LocalBucketStore,
+    RateLimitHeadersMiddleware,
+    RedisBucketStore,
+    get_bucket_store,
+    local_bucket_store,
+)
+
+User = get_user_model()
+
+
+class PerRequestFilterBackendTest(SimpleTestCase):
+    def test_filterset_is_built_once_per_view(self):
+        request = Request(APIRequestFactory().get("/", {"q": "psicologo"}))
+        view = ProfessionalViewSet()
+        backend = PerRequestFilterBackend()
+        queryset = Professional.objects.all()
+
+        with mock.patch.object(type(queryset), "exists", return_value=True) as exists:
+            first = backend.filter_queryset(request, queryset, view)
+            second = backend.filter_queryset(request, queryset.values("id"), view)
+        # The full-text check runs once, and each queryset is filtered
+        exists.assert_called_once()
+        self.assertIn("rank", first.query.annotations)
+        self.assertIn("rank", second.query.annotations)
+        self.assertEqual(second.query.values_select, ("id",))
+
+
+@override_settings(
+    REST_FRAMEWORK={
+        **settings.REST_FRAMEWORK,
+        "DEFAULT_THROTTLE_RATES": {"token": "4/min", "endpoint": "2/min"},
+    }
+)
+class ThrottlingTest(APITestCase):
+    def setUp(self):
+        local_bucket_store.clear()
+        self.user = User.objects.create_user(
+            email="test@example.com", password="testpass"
+        )
+        self.token = Token.objects.get(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token.key}")
+        self.url = reverse("appointment-list")
+
+    def test_endpoint_bucket_limits_each_route(self):
+        first = self.client.get(self.url)
+        self.assertEqual(first["X-RateLimit-Limit"], "2")
+        self.assertEqual(first["X-RateLimit-Remaining"], "1")
+        self.assertEqual(self.client.get(self.url)["X-RateLimit-Remaining"], "0")
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        # One request refills every 30 seconds
+        self.assertIn(int(response["Retry-After"]), range(1, 31))
+
+        # Another route has its own endpoint bucket, but shares the token one
+        response = self.client.get(reverse("professional-list"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        response = self.client.get(reverse("professional-list"))
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+
+    def test_buckets_are_per_token(self):
+        for _ in range(2):
+            self.client.get(self.url)
+        other = User.objects.create_user(email="other@example.com", password="pass")
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {other.auth_token.key}")
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+class LocalBucketStoreTest(SimpleTestCase):
+    def test_bucket_allows_bursts_up_to_its_capacity(self):
+        store = LocalBucketStore()
+        self.assertEqual(store.take("key", 2, 60000)[:2], (True, 1))
+        self.assertEqual(store.take("key", 2, 60000)[:2], (True, 0))
+        allowed, remaining, wait = store.take("key", 2, 60000)
+        self.assertEqual((allowed, remaining), (False, 0))
+        self.assertGreater(wait, 59000)
+
+    def test_bucket_refills_over_time(self):
+        store = LocalBucketStore()
+        store.take("key", 1, 10)
+        self.assertFalse(store.take("key", 1, 60000)[0])
+        time.sleep(0.02)
+        self.assertTrue(store.take("key", 1, 10)[0])
+
+    def test_least_recently_used_bucket_is_dropped(self):
+        store = LocalBucketStore(max_size=1)
+        store.take("a", 1, 60000)
+        store.take("b", 1, 60000)
+        self.assertTrue(store.take("a", 1, 60000)[0])
+
+
+class RedisBucketStoreTest(SimpleTestCase):
+    @override_settings(
+        CACHES={
+            "default": {
+                "BACKEND": "django.core.cache.backends.redis.RedisCache",
+                "LOCATION": "redis://localhost:6379/0",
+            }
+        }
+    )
+    def test_take_runs_the_script_on_the_redis_of_the_cache(self):
+        client = mock.Mock()
+        client.eval.return_value = [1, 4, 0]
+        with mock.patch.object(RedisCache, "_cache") as redis_cache:
+            redis_cache.get_client.return_value = client
+            store = get_bucket_store()
+            self.assertIsInstance(store, RedisBucketStore)
+            self.assertEqual(store.take("throttle:key", 5, 12000), (True, 4, 0))
+
+        key = store.cache.make_and_validate_key("throttle:key")
+        redis_cache.get_client.assert_called_once_with(key, write=True)
+        client.eval.assert_called_once_with(TAKE_SCRIPT, 1, key, 5, 12000)
+
+    def test_local_memory_cache_uses_the_local_store(self):
+        self.assertIs(get_bucket_store(), local_bucket_store)
+
+
+class AsyncMiddlewareTest(SimpleTestCase):
+    @override_settings(DEBUG=True)
+    def test_asgi_middleware_chain_has_no_sync_only_middleware(self):
+        # In debug, Django logs each handler it adapts to run a sync-only
+        # middleware, which would run the async views in a thread.
+        with self.assertNoLogs("django.request", "DEBUG"):
+            ASGIHandler()
+
+    async def test_rate_limit_headers_in_async_mode(self):
+        async def get_response(request):
+            request.rate_limit = {"limit": 5, "remaining": 4, "reset": 12}
+            return HttpResponse()
+
+        middleware = RateLimitHeadersMiddleware(get_response)
+        self.assertTrue(iscoroutinefunction(middleware))
+        response = await middleware(RequestFactory().get("/"))
+        self.assertEqual(response["X-RateLimit-Remaining"], "4")
+
+    async def test_whitenoise_passes_other_requests_in_async_mode(self):
+        async def get_response(request):
+            return HttpResponse("view")
+
+        middleware = AsyncWhiteNoiseMiddleware(get_response)
+        self.assertTrue(iscoroutinefunction(middleware))
+        response = await middleware(RequestFactory().get("/api/"))
+        self.assertEqual(response.content, b"view")
+
+
+class AsgiSettingsTest(SimpleTestCase):
+    def get_conn_max_age(self, module, **environ):
+        code = (
+            f"import {module}; from django.conf import settings; "
+            "print(settings.DATABASES['default']['CONN_MAX_AGE'])"
+        )
+        env = {**os.environ, "POSTGRES_POOL": "0", "ASYNC_READS": "0", **environ}
+        env.pop("ASGI", None)
+        result = subprocess.run(
+            [sys.executable, "-c", code],
+            env=env,
+            cwd=settings.BASE_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        return int(result.stdout)
+
+    def test_asgi_never_keeps_persistent_connections(self):
+        # Even without the async views of ASYNC_READS
+        self.assertEqual(self.get_conn_max_age("config.asgi", ASYNC_READS="0"), 0)
+        self.assertEqual(
+            self.get_conn_max_age("config.wsgi", POSTGRES_CONN_MAX_AGE="60"), 60
+        )
+
+
+class PoolStatsTest(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email="admin@example.com", password="testpass", is_staff=True
+        )
+        self.client.force_authenticate(self.user)
+        self.url = reverse("pool-stats")
+
+    def test_pool_stats(self):
+        stats = {
+            "pool_min": 2,
+            "pool_max": 10,
+            "pool_size": 3,
+            "pool_available": 1,
+            "requests_waiting": 0,
+            "requests_num": 5,
+        }
+        with mock.patch("config.database.connection") as connection:
+            connection.pool.get_stats.return_value = stats
+            response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.data["enabled"])
+        self.assertEqual(response.data["connections_in_use"], 2)
+        self.assertEqual(response.data["requests_num"], 5)
+        self.assertEqual(response.data["requests_errors"], 0)
+
+    def test_pool_stats_without_pool(self):
+        with mock.patch("config.database.connection") as connection:
+            connection.pool = None
+            response = self.client.get(self.url)
+        self.assertEqual(response.data, {"enabled": False})
+
+    def test_pool_stats_are_staff_only(self):
+        self.user.is_staff = False
+        self.user.save()
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_pool_stats_of_the_test_connection(self):
+        if connection.pool is None:
+            self.skipTest("POSTGRES_POOL=0")
+        response = self.client.get(self.url)
+        self.assertTrue(response.data["enabled"])
+        pool = settings.DATABASES["default"]["OPTIONS"]["pool"]
+        self.assertEqual(response.data["pool_max"], pool["max_size"])
+        # The test case holds a connection of the pool in its transaction
+        self.assertGreaterEqual(response.data["connections_in_use"], 1)
+        self.assertGreaterEqual(response.data["requests_num"], 1)
@@ -0,0 +1,231 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.core.cache import caches
+from django.core.cache.backends.redis import RedisCache
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+# Refill the bucket for the time elapsed since the last request, then take
+# one token if there is one. Runs atomically in Redis, with the Redis clock,
+# so every worker shares the same bucket. Returns [allowed, tokens left,
+# milliseconds until the next token].
+TAKE_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local refill_ms = tonumber(ARGV[2])
+local now = redis.call("TIME")
+now = now[1] * 1000 + math.floor(now[2] / 1000)
+local bucket = redis.call("HMGET", KEYS[1], "tokens", "at")
+local tokens = tonumber(bucket[1]) or capacity
+local at = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - at) / refill_ms)
+local allowed = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+end
+redis.call("HSET", KEYS[1], "tokens", tostring(tokens), "at", now)
+redis.call("PEXPIRE", KEYS[1], math.ceil(capacity * refill_ms))
+local wait = 0
+if tokens < 1 then
+    wait = math.ceil((1 - tokens) * refill_ms)
+end
+return {allowed, math.floor(tokens), wait}
+"""
+
+
+class LocalBucketStore:
+    """
+    Token buckets in the memory of the process, used with the local memory
+    cache: each worker has its own buckets. The least recently used buckets
+    are dropped beyond `max_size` (a dropped bucket starts full again).
+    """
+
+    def __init__(self, max_size=10000):
+        self.max_size = max_size
+        self.buckets = OrderedDict()
+        self.lock = threading.Lock()
+
+    def take(self, key, capacity, refill_ms):
+        now = time.monotonic() * 1000
+        with self.lock:
+            tokens, at = self.buckets.pop(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - at) / refill_ms)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            self.buckets[key] = (tokens, now)
+            if len(self.buckets) > self.max_size:
+                self.buckets.popitem(last=False)
+        wait = math.ceil((1 - tokens) * refill_ms) if tokens < 1 else 0
+        return allowed, math.floor(tokens), wait
+
+    def clear(self):
+        with self.lock:
+            self.buckets.clear()
+
+
+def get_redis_client(cache, key):
+    """
+    Return the redis-py client of `cache` (a `RedisCache`) for `key`.
+
+    Django doesn't expose the client, which is needed to run scripts, so
+    this is the only place relying on the private `RedisCache._cache`. It
+    picks the server written to for `key`, like `cache.set()` would.
+    """
+    return cache._cache.get_client(key, write=True)
+
+
+class RedisBucketStore:
+    """Token buckets in the Redis of the default cache, shared by every worker."""
+
+    def __init__(self, cache):
+        self.cache = cache
+
+    def take(self, key, capacity, refill_ms):
+        key = self.cache.make_and_validate_key(key)
+        client = get_redis_client(self.cache, key)
+        allowed, tokens, wait = client.eval(TAKE_SCRIPT, 1, key, capacity, refill_ms)
+        return bool(allowed), tokens, wait
+
+
+local_bucket_store = LocalBucketStore()
+
+
+def get_bucket_store():
+    # The backend itself: `django.core.cache.cache` is a proxy, never an
+    # instance of the backend class.
+    cache = caches["default"]
+    if isinstance(cache, RedisCache):
+        return RedisBucketStore(cache)
+    return local_bucket_store
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    Token bucket throttle: a bucket holds up to the number of requests of
+    the rate (e.g. `"120/min"` -> 120) and refills continuously at that
+    rate, so bursts are allowed up to the capacity. Each check is a single
+    atomic operation on the bucket store, without database writes.
+
+    The rate is read from `DEFAULT_THROTTLE_RATES[scope]`. The state of the
+    most restrictive bucket is exposed in the `X-RateLimit-*` headers by
+    `RateLimitHeadersMiddleware`.
+
+    DRF checks every throttle of the view, even after one rejected the
+    request, so a rejected request still takes a token from the other
+    buckets: a client retrying too fast on one route also drains its
+    token bucket.
+    """
+
+    scope = None
+    durations = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+    def get_rate(self, view):
+        return api_settings.DEFAULT_THROTTLE_RATES.get(self.scope)
+
+    def get_cache_key(self, request, view):
+        raise NotImplementedError(".get_cache_key() must be overridden")
+
+    def parse_rate(self, rate):
+        requests, period = rate.split("/")
+        return int(requests), self.durations[period[0]]
+
+    def allow_request(self, request, view):
+        rate = self.get_rate(view)
+        key = self.get_cache_key(request, view) if rate else None
+        if key is None:
+            return True
+
+        capacity, duration = self.parse_rate(rate)
+        refill_ms = duration * 1000 / capacity
+        allowed, remaining, wait = get_bucket_store().take(
+            f"throttle:{key}", capacity, refill_ms
+        )
+        self.wait_ms = wait
+
+        state = getattr(request._request, "rate_limit", None)
+        if state is None or remaining < state["remaining"]:
+            request._request.rate_limit = {
+                "limit": capacity,
+                "remaining": remaining,
+                # Seconds until the bucket is full again
+                "reset": math.ceil((capacity - remaining) * refill_ms / 1000),
+            }
+        return allowed
+
+    def wait(self):
+        return self.wait_ms / 1000
+
+
+class TokenRateThrottle(TokenBucketThrottle):
+    """
+    One bucket per token (authenticated user) shared by every endpoint,
+    or per client IP for anonymous requests.
+    """
+
+    scope = "token"
+
+    def get_ident_key(self, request):
+        if request.user and request.user.is_authenticated:
+            return f"user:{request.user.pk}"
+        return f"ip:{self.get_ident(request)}"
+
+    def get_cache_key(self, request, view):
+        return f"{self.scope}:{self.get_ident_key(request)}"
+
+
+class EndpointRateThrottle(TokenRateThrottle):
+    """
+    One bucket per token and route. Views can set `throttle_scope` to use
+    the rate of that scope instead of the `endpoint` rate.
+    """
+
+    scope = "endpoint"
+
+    def get_rate(self, view):
+        scope = getattr(view, "throttle_scope", None) or self.scope
+        return api_settings.DEFAULT_THROTTLE_RATES.get(scope)
+
+    def get_cache_key(self, request, view):
+        match = request.resolver_match
+        route = match.route if match else request.path
+        return f"{self.scope}:{request.method}:{route}:{self.get_ident_key(request)}"
+
+
+class RateLimitHeadersMiddleware:
+    """
+    Add the state of the throttles of the request to the response headers.
+
+    Sync and async capable, so it doesn't make Django run the async views
+    in a thread under ASGI.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        return self.add_headers(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        return self.add_headers(request, await self.get_response(request))
+
+    @staticmethod
+    def add_headers(request, response):
+        state = getattr(request, "rate_limit", None)
+        if state is not None:
+            response["X-RateLimit-Limit"] = state["limit"]
+            response["X-RateLimit-Remaining"] = state["remaining"]
+            response["X-RateLimit-Reset"] = state["reset"]
+        return response
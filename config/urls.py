@@ -26,27 +26,35 @@ from drf_spectacular.views import (
 from rest_framework import routers
 
 from appointments.views import AppointmentViewset
+from config.database import pool_stats
 from professionals.views import ProfessionalViewSet
 
-router = routers.DefaultRouter()
-router.register(r"professionals", ProfessionalViewSet, basename="professional")
-router.register(r"appointments", AppointmentViewset, basename="appointment")
-
 
 def healthz(_request):
     return HttpResponse("ok")
 
 
-urlpatterns = [
-    path("admin/", admin.site.urls),
-    path("healthz/", healthz),
-    path("api-auth/", include("rest_framework.urls", namespace="rest_framework")),
-    path("api/schema/", SpectacularAPIView.as_view(), name="schema"),
-    path(
-        "api/docs/",
-        SpectacularSwaggerView.as_view(url_name="schema"),
-        name="swagger-ui",
-    ),
-    path("api/redoc/", SpectacularRedocView.as_view(url_name="schema"), name="redoc"),
-    path("api/", include(router.urls)),
-]
+def get_urlpatterns(router):
+    router.register(r"professionals", ProfessionalViewSet, basename="professional")
+    router.register(r"appointments", AppointmentViewset, basename="appointment")
+    return [
+        path("admin/", admin.site.urls),
+        path("healthz/", healthz),
+        path("api-auth/", include("rest_framework.urls", namespace="rest_framework")),
+        path("api/schema/", SpectacularAPIView.as_view(), name="schema"),
+        path(
+            "api/docs/",
+            SpectacularSwaggerView.as_view(url_name="schema"),
+            name="swagger-ui",
+        ),
+        path(
+            "api/redoc/",
+            SpectacularRedocView.as_view(url_name="schema"),
+            name="redoc",
+        ),
+        path("api/pool-stats/", pool_stats, name="pool-stats"),
+        path("api/", include(router.urls)),
+    ]
+
+
+urlpatterns = get_urlpatterns(routers.DefaultRouter())
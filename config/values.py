@@ -0,0 +1,300 @@
+from types import SimpleNamespace
+
+from asgiref.sync import sync_to_async
+from django.core.exceptions import ImproperlyConfigured
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import QuerySet
+from django.http import Http404
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+from rest_framework.generics import get_object_or_404
+from rest_framework.response import Response
+
+
+class ValuesRenderer:
+    """
+    Render `.values()` rows exactly like the serializer renders model
+    instances, without building a model instance or running the DRF field
+    machinery for each row.
+
+    The readable fields are resolved once into a list of getters: plain
+    fields keep their bound `to_representation`, nested serializers are
+    compiled recursively, and `SerializerMethodField`s call the serializer
+    method with an object holding the columns listed for them in the
+    serializer's `values_sources`. The serializer can also define
+    `represent_annotations(instance, data)`, called with the whole row.
+
+    `fields` limits the rendered fields, and so the selected columns.
+    """
+
+    def __init__(self, serializer, prefix="", fields=None):
+        self.serializer = serializer
+        self.lookups = []
+        self.getters = [
+            (name, self.compile(field, prefix))
+            for name, field in serializer.fields.items()
+            if not field.write_only and (fields is None or name in fields)
+        ]
+        self.represent_annotations = (
+            getattr(serializer, "represent_annotations", None) if not prefix else None
+        )
+
+    def compile(self, field, prefix):
+        if isinstance(field, serializers.ListSerializer):
+            raise ImproperlyConfigured(
+                f"{field.field_name}: many=True is not supported by ValuesRenderer."
+            )
+
+        if isinstance(field, serializers.SerializerMethodField):
+            sources = getattr(self.serializer, "values_sources", {})
+            if field.field_name not in sources:
+                raise ImproperlyConfigured(
+                    f"{type(self.serializer).__name__}.values_sources must list "
+                    f"the columns read by `{field.field_name}`."
+                )
+            keys = [(source, prefix + source) for source in sources[field.field_name]]
+            self.lookups.extend(key for _, key in keys)
+            method = getattr(self.serializer, field.method_name)
+
+            def get(row):
+                columns = {name: row[key] for name, key in keys}
+                return method(SimpleNamespace(**columns))
+
+            return get
+
+        if field.source == "*":
+            raise ImproperlyConfigured(
+                f"{field.field_name}: source='*' is not supported by ValuesRenderer."
+            )
+        key = prefix + "__".join(field.source_attrs)
+        self.lookups.append(key)
+
+        if isinstance(field, serializers.BaseSerializer):
+            # The foreign key column tells a missing related object apart.
+            nested = ValuesRenderer(field, prefix=f"{key}__")
+            self.lookups.extend(nested.lookups)
+
+            def get(row):
+                return None if row[key] is None else nested.render(row)
+
+            return get
+
+        to_representation = field.to_representation
+
+        def get(row):
+            value = row[key]
+            return None if value is None else to_representation(value)
+
+        return get
+
+    def values(self, queryset, *lookups):
+        """
+        Return `queryset` as `.values()` rows with the rendered columns, the
+        extra `lookups` and the selected annotations.
+        """
+        annotations = queryset.query.annotation_select
+        return queryset.values(*dict.fromkeys([*self.lookups, *lookups, *annotations]))
+
+    def render(self, row):
+        data = {name: get(row) for name, get in self.getters}
+        if self.represent_annotations is not None:
+            self.represent_annotations(SimpleNamespace(**row), data)
+        return data
+
+    def render_many(self, rows):
+        return [self.render(row) for row in rows]
+
+
+class ValuesSerializer:
+    """
+    Read-only stand-in for a serializer, rendering `.values()` rows.
+
+    Each of the `includes` is called with the rows and their rendered data,
+    once for the whole list, to add related data to them.
+    """
+
+    def __init__(self, renderer, instance, many=False, includes=(), **kwargs):
+        if many and isinstance(instance, QuerySet):
+            instance = renderer.values(instance)
+        self.renderer = renderer
+        self.instance = instance
+        self.many = many
+        self.includes = includes
+
+    @property
+    def data(self):
+        rows = list(self.instance) if self.many else [self.instance]
+        data = self.renderer.render_many(rows)
+        for include in self.includes:
+            include(rows, data)
+        return data if self.many else data[0]
+
+    async def adata(self):
+        """`data` for the async read path, fetching a queryset asynchronously."""
+        if not self.many:
+            rows = [self.instance]
+        elif isinstance(self.instance, QuerySet):
+            rows = [row async for row in self.instance]
+        else:
+            rows = list(self.instance)
+        data = self.renderer.render_many(rows)
+        for include in self.includes:
+            await sync_to_async(include)(rows, data)
+        return data if self.many else data[0]
+
+
+class ValuesReadMixin:
+    """
+    Read-only fast path for list and retrieve: rows are fetched with
+    `.values()` and rendered by a `ValuesRenderer` compiled from the
+    serializer, so the JSON is the same as the serializer's.
+
+    Pages and detail objects are dicts instead of model instances. Writes,
+    the forms of the browsable API and the schema generation keep using
+    the serializer.
+
+    `?fields=` (comma separated) selects the rendered fields, and only
+    their columns are fetched. `values_lookups` are fetched in every row,
+    for code that reads the rows besides the renderer.
+
+    `?include=` (comma separated) adds the related data listed in
+    `includes`: a mapping of name -> name of a view method, called as
+    `method(rows, data)` for the whole page.
+
+    `alist` and `aretrieve` are the same read path for async views (see
+    `config.asynchronous`), fetching the rows with the async ORM.
+    """
+
+    values_actions = ("list", "retrieve")
+    values_lookups = []
+    fields_query_param = "fields"
+    include_query_param = "include"
+    includes = {}
+
+    def uses_values(self):
+        return (
+            self.action in self.values_actions
+            and self.request.method in ("GET", "HEAD")
+            and not getattr(self, "swagger_fake_view", False)
+        )
+
+    def get_values_renderer(self):
+        if not hasattr(self, "_values_renderer"):
+            serializer_class = self.get_serializer_class()
+            serializer = serializer_class(context=self.get_serializer_context())
+            self._values_renderer = ValuesRenderer(
+                serializer, fields=self.get_values_fields(serializer)
+            )
+        return self._values_renderer
+
+    def get_values_fields(self, serializer):
+        """Return the fields selected with `?fields=`, or None for all of them."""
+        value = self.request.query_params.get(self.fields_query_param, "")
+        fields = {name.strip() for name in value.split(",") if name.strip()}
+        if not fields:
+            return None
+
+        readable = [
+            name for name, field in serializer.fields.items() if not field.write_only
+        ]
+        unknown = fields.difference(readable)
+        if unknown:
+            raise ValidationError(
+                {
+                    self.fields_query_param: (
+                        f"Campos inválidos: {', '.join(sorted(unknown))}. "
+                        f"Use: {', '.join(readable)}."
+                    )
+                }
+            )
+        return fields
+
+    def get_serializer(self, *args, **kwargs):
+        if not args or not self.uses_values():
+            return super().get_serializer(*args, **kwargs)
+        return ValuesSerializer(
+            self.get_values_renderer(), *args, includes=self.get_includes(), **kwargs
+        )
+
+    def get_includes(self):
+        """Return the methods of the includes requested with `?include=`."""
+        value = self.request.query_params.get(self.include_query_param, "")
+        names = list(
+            dict.fromkeys(name.strip() for name in value.split(",") if name.strip())
+        )
+        unknown = [name for name in names if name not in self.includes]
+        if unknown:
+            raise ValidationError(
+                {
+                    self.include_query_param: (
+                        f"Inclusões inválidas: {', '.join(unknown)}. "
+                        f"Use: {', '.join(self.includes)}."
+                    )
+                }
+            )
+        return [getattr(self, self.includes[name]) for name in names]
+
+    def paginate_queryset(self, queryset):
+        if self.uses_values():
+            queryset = self.get_values_renderer().values(queryset, *self.values_lookups)
+        return super().paginate_queryset(queryset)
+
+    def get_object(self):
+        if not self.uses_values():
+            return super().get_object()
+
+        queryset, filters = self.get_values_object_lookup()
+        row = get_object_or_404(queryset, **filters)
+        self.check_object_permissions(self.request, row)
+        return row
+
+    async def aget_object(self):
+        queryset, filters = await sync_to_async(self.get_values_object_lookup)()
+        try:
+            row = await queryset.aget(**filters)
+        except (
+            queryset.model.DoesNotExist,
+            TypeError,
+            ValueError,
+            DjangoValidationError,
+        ):
+            # Like `get_object_or_404`
+            raise Http404
+        self.check_object_permissions(self.request, row)
+        return row
+
+    def get_values_object_lookup(self):
+        """Return the `.values()` queryset and the filters of the detail row."""
+        # The conditional GET validators are read from the row.
+        lookups = [
+            "pk",
+            *getattr(self, "last_modified_fields", []),
+            *self.values_lookups,
+        ]
+        queryset = self.get_values_renderer().values(
+            self.filter_queryset(self.get_queryset()), *lookups
+        )
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        return queryset, {self.lookup_field: self.kwargs[lookup_url_kwarg]}
+
+    async def apaginate_queryset(self, queryset):
+        if self.paginator is None:
+            return None
+        queryset = self.get_values_renderer().values(queryset, *self.values_lookups)
+        return await self.paginator.apaginate_queryset(
+            queryset, self.request, view=self
+        )
+
+    async def alist(self, request, *args, **kwargs):
+        queryset = await sync_to_async(self.filter_queryset)(self.get_queryset())
+        page = await self.apaginate_queryset(queryset)
+        if page is not None:
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(await serializer.adata())
+        serializer = self.get_serializer(queryset, many=True)
+        return Response(await serializer.adata())
+
+    async def aretrieve(self, request, *args, **kwargs):
+        instance = await self.aget_object()
+        serializer = self.get_serializer(instance)
+        return Response(await serializer.adata())
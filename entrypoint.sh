@@ -5,6 +5,11 @@ PORT="${PORT:-8000}"
 if [ "$1" = "gunicorn" ]; then
     echo "Applying migrations..."
     python manage.py migrate --noinput
+    if [ "$ASGI" = "1" ]; then
+        echo "Starting Gunicorn with Uvicorn workers (ASGI) on 0.0.0.0:$PORT..."
+        exec gunicorn config.asgi:application --bind 0.0.0.0:$PORT --workers 3 \
+            --worker-class uvicorn_worker.UvicornWorker
+    fi
     echo "Starting Gunicorn on 0.0.0.0:$PORT..."
     exec gunicorn config.wsgi:application --bind 0.0.0.0:$PORT --workers 3
 else
@@ -1,5 +1,13 @@
 from django.contrib import admin
 
-from .models import Professional
+from .models import Professional, WorkingHours
 
-admin.site.register(Professional)
+
+class WorkingHoursInline(admin.TabularInline):
+    model = WorkingHours
+    extra = 0
+
+
+@admin.register(Professional)
+class ProfessionalAdmin(admin.ModelAdmin):
+    inlines = [WorkingHoursInline]
@@ -0,0 +1,44 @@
+import datetime
+
+from django.utils import timezone
+
+
+def free_slots(working_hours, booked, start_date, end_date, slot, now=None):
+    """
+    Return the start of every free slot between two dates (inclusive).
+
+    `working_hours` is a sequence of (weekday, start_time, end_time) ordered
+    by weekday and start time, without overlapping intervals. `booked` is the
+    sorted list of the professional's appointment times; each appointment
+    occupies one slot starting at its scheduled time.
+
+    Candidate slots are generated in chronological order, so the bookings
+    are consumed with a single pointer (a sorted merge) instead of one lookup
+    per slot.
+    """
+    tz = timezone.get_current_timezone()
+    now = now or timezone.now()
+
+    intervals_by_weekday = {}
+    for weekday, start_time, end_time in working_hours:
+        intervals_by_weekday.setdefault(weekday, []).append((start_time, end_time))
+
+    slots = []
+    index = 0
+    day = start_date
+    while day <= end_date:
+        for start_time, end_time in intervals_by_weekday.get(day.weekday(), ()):
+            current = timezone.make_aware(
+                datetime.datetime.combine(day, start_time), tz
+            )
+            closing = timezone.make_aware(datetime.datetime.combine(day, end_time), tz)
+            while current + slot <= closing:
+                # Skip bookings that end before this slot starts.
+                while index < len(booked) and booked[index] <= current - slot:
+                    index += 1
+                is_free = index == len(booked) or booked[index] >= current + slot
+                if is_free and current >= now:
+                    slots.append(current)
+                current += slot
+        day += datetime.timedelta(days=1)
+    return slots
@@ -0,0 +1,94 @@
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    TrigramWordSimilarity,
+)
+from django.db.models import F, Value
+from django.db.models.functions import Lower
+from django_filters import rest_framework as filters
+
+from .geo import bounding_box, haversine_km
+from .models import SEARCH_CONFIG, ImmutableUnaccent, Professional
+from .serializers import ProximityQuerySerializer
+
+
+class ProfessionalFilter(filters.FilterSet):
+    """
+    Search professionals by name, profession, neighborhood and city.
+
+    `q` is matched against the `search_vector` column (Portuguese stemming,
+    accents ignored) and results are ranked by relevance. Only when nothing
+    matches, to tolerate typos, it falls back to the trigram similarity of
+    the `search_text` column. Both lookups are answered by GIN indexes.
+
+    `near` (a CEP) and `radius_km` keep the professionals around the CEP,
+    ordered by distance.
+    """
+
+    q = filters.CharFilter(method="search", label="Busca")
+    near = filters.CharFilter(method="filter_near", label="CEP")
+    radius_km = filters.NumberFilter(method="filter_radius", label="Raio (km)")
+
+    class Meta:
+        model = Professional
+        fields = []
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Whether the full-text search matches anything. Kept for the next
+        # filterings of the request (see `PerRequestFilterBackend`).
+        self.search_has_matches = None
+
+    def search(self, queryset, name, value):
+        value = value.strip()
+        if not value:
+            return queryset
+
+        query = SearchQuery(value, config=SEARCH_CONFIG, search_type="websearch")
+        matches = queryset.filter(search_vector=query)
+        if self.search_has_matches is None:
+            self.search_has_matches = matches.exists()
+        if self.search_has_matches:
+            rank = SearchRank(F("search_vector"), query)
+            return matches.annotate(rank=rank).order_by("-rank", "id")
+
+        term = ImmutableUnaccent(Lower(Value(value)))
+        return (
+            queryset.filter(search_text__trigram_word_similar=term)
+            .annotate(rank=TrigramWordSimilarity(term, "search_text"))
+            .order_by("-rank", "id")
+        )
+
+    def filter_near(self, queryset, name, value):
+        """
+        Keep the professionals within `radius_km` of the CEP, nearest first.
+
+        A bounding box on the (latitude, longitude) index narrows the rows
+        before the exact haversine distance is computed.
+        """
+        query = ProximityQuerySerializer(
+            data={"near": value, "radius_km": self.data.get("radius_km", 10)}
+        )
+        query.is_valid(raise_exception=True)
+        latitude, longitude, radius_km = (
+            query.validated_data["latitude"],
+            query.validated_data["longitude"],
+            query.validated_data["radius_km"],
+        )
+
+        min_latitude, max_latitude, min_longitude, max_longitude = bounding_box(
+            latitude, longitude, radius_km
+        )
+        return (
+            queryset.filter(
+                latitude__range=(min_latitude, max_latitude),
+                longitude__range=(min_longitude, max_longitude),
+            )
+            .annotate(distance_km=haversine_km(latitude, longitude))
+            .filter(distance_km__lte=radius_km)
+            .order_by("distance_km", "id")
+        )
+
+    def filter_radius(self, queryset, name, value):
+        # Applied by `filter_near`
+        return queryset
@@ -0,0 +1,41 @@
+import math
+
+from django.db.models import F, FloatField, Value
+from django.db.models.functions import ASin, Cos, Power, Radians, Sin, Sqrt
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+
+
+def bounding_box(latitude, longitude, radius_km):
+    """
+    Return (min_latitude, max_latitude, min_longitude, max_longitude) of a box
+    containing every point within `radius_km` of the given point.
+
+    The box is used as an index prefilter, so it only has to be a superset
+    of the circle. It does not handle the poles or the antimeridian, which
+    are far from any Brazilian CEP.
+    """
+    latitude_delta = radius_km / KM_PER_DEGREE
+    longitude_delta = radius_km / (
+        KM_PER_DEGREE * max(math.cos(math.radians(latitude)), 0.01)
+    )
+    return (
+        latitude - latitude_delta,
+        latitude + latitude_delta,
+        longitude - longitude_delta,
+        longitude + longitude_delta,
+    )
+
+
+def haversine_km(latitude, longitude):
+    """
+    SQL expression of the great-circle distance, in km, between the
+    `latitude`/`longitude` columns and the given point.
+    """
+    latitude_delta = Radians(F("latitude") - Value(latitude)) / 2
+    longitude_delta = Radians(F("longitude") - Value(longitude)) / 2
+    a = Power(Sin(latitude_delta), 2) + Cos(Radians(Value(latitude))) * Cos(
+        Radians(F("latitude"))
+    ) * Power(Sin(longitude_delta), 2)
+    return 2 * EARTH_RADIUS_KM * ASin(Sqrt(a), output_field=FloatField())
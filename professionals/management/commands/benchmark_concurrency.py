@@ -0,0 +1,63 @@
+import time
+import urllib.error
+import urllib.request
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure the throughput of concurrent GETs against a running server, "
+        "to compare Gunicorn with sync workers (config.wsgi) and with Uvicorn "
+        "workers (config.asgi, ASYNC_READS=1). Raise the THROTTLE_*_RATE "
+        "settings of the server, or the requests are throttled."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("url", help="URL to request, e.g. /api/professionals/")
+        parser.add_argument("--token", help="API token of the requests")
+        parser.add_argument("--requests", type=int, default=500)
+        parser.add_argument("--concurrency", type=int, default=50)
+        parser.add_argument("--timeout", type=float, default=30)
+
+    def handle(self, *args, **options):
+        url, timeout = options["url"], options["timeout"]
+        headers = {"Accept": "application/json"}
+        if options["token"]:
+            headers["Authorization"] = f"Token {options['token']}"
+
+        def fetch(_):
+            request = urllib.request.Request(url, headers=headers)
+            start = time.perf_counter()
+            try:
+                with urllib.request.urlopen(request, timeout=timeout) as response:
+                    response.read()
+                    status = response.status
+            except urllib.error.HTTPError as error:
+                status = error.code
+            except OSError:
+                status = "error"
+            return status, time.perf_counter() - start
+
+        requests, concurrency = options["requests"], options["concurrency"]
+        start = time.perf_counter()
+        with ThreadPoolExecutor(concurrency) as pool:
+            results = list(pool.map(fetch, range(requests)))
+        elapsed = time.perf_counter() - start
+
+        latencies = sorted(latency for _, latency in results)
+        statuses = Counter(str(status) for status, _ in results)
+        self.stdout.write(
+            f"{requests} requests, concurrency {concurrency}: "
+            f"{requests / elapsed:.1f} req/s, "
+            f"p50 {self.percentile(latencies, 50) * 1000:.0f} ms, "
+            f"p95 {self.percentile(latencies, 95) * 1000:.0f} ms "
+            f"({', '.join(f'{status}: {count}' for status, count in statuses.items())})"
+        )
+
+    @staticmethod
+    def percentile(values, percent):
+        index = round(percent / 100 * (len(values) - 1))
+        return values[index]
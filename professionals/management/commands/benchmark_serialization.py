@@ -0,0 +1,132 @@
+import timeit
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from appointments.models import Appointment
+from appointments.serializers import AppointmentSerializer
+from config.values import ValuesRenderer
+from professionals.models import Professional
+from professionals.serializers import ProfessionalSerializer
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the per-row cost of the list serializers with the `.values()` "
+        "read path. Rows are built in memory, so the database is not used: "
+        "the serializer side includes building the model instances, as the "
+        "ORM would."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=1000)
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def handle(self, *args, **options):
+        rows, repeat = options["rows"], options["repeat"]
+        now = timezone.now()
+        cases = [
+            (
+                "professionals",
+                ProfessionalSerializer,
+                [self.professional_row(index, now) for index in range(rows)],
+                self.build_professional,
+            ),
+            (
+                "appointments",
+                AppointmentSerializer,
+                [self.appointment_row(index, now) for index in range(rows)],
+                self.build_appointment,
+            ),
+        ]
+
+        for name, serializer_class, values, build in cases:
+            renderer = ValuesRenderer(serializer_class())
+
+            def serialize():
+                instances = [build(row) for row in values]
+                return serializer_class(instances, many=True).data
+
+            def render():
+                return renderer.render_many(values)
+
+            if JSONRenderer().render(serialize()) != JSONRenderer().render(render()):
+                raise CommandError(f"{name}: the rendered JSON differs.")
+
+            serializer_time = min(timeit.repeat(serialize, number=1, repeat=repeat))
+            values_time = min(timeit.repeat(render, number=1, repeat=repeat))
+            self.stdout.write(
+                f"{name}: serializer {serializer_time / rows * 1e6:.1f} µs/row, "
+                f"values {values_time / rows * 1e6:.1f} µs/row "
+                f"({serializer_time / values_time:.1f}x)"
+            )
+
+    @staticmethod
+    def professional_row(index, now):
+        return {
+            "id": index,
+            "name": f"Profissional {index}",
+            "profession": Professional.ProfessionChoices.PSYCHOLOGIST.value,
+            "full_address": (
+                "Rua das Couves, 123  - Centro, Rio de Janeiro, RJ. CEP:12345678"
+            ),
+            "phone": "2111112222",
+            "email": f"profissional{index}@example.com",
+            "created_at": now,
+            "updated_at": now,
+        }
+
+    @staticmethod
+    def appointment_row(index, now):
+        return {
+            "id": index,
+            "professional": index,
+            "professional__id": index,
+            "professional__name": f"Profissional {index}",
+            "professional__profession": (
+                Professional.ProfessionChoices.PSYCHOLOGIST.value
+            ),
+            "scheduled_at": now,
+            "created_at": now,
+            "updated_at": now,
+        }
+
+    @staticmethod
+    def from_db(model, values):
+        """
+        Build an instance like the ORM does. With deferred fields, `from_db`
+        expects the values in the order of the model fields.
+        """
+        names = [
+            field.attname
+            for field in model._meta.concrete_fields
+            if field.attname in values
+        ]
+        return model.from_db("default", names, [values[name] for name in names])
+
+    def build_professional(self, row):
+        return self.from_db(Professional, row)
+
+    def build_appointment(self, row):
+        professional = self.from_db(
+            Professional,
+            {
+                "id": row["professional__id"],
+                "name": row["professional__name"],
+                "profession": row["professional__profession"],
+            },
+        )
+        appointment = self.from_db(
+            Appointment,
+            {
+                "id": row["id"],
+                "professional_id": row["professional"],
+                "scheduled_at": row["scheduled_at"],
+                "created_at": row["created_at"],
+                "updated_at": row["updated_at"],
+            },
+        )
+        # Like `select_related`
+        Appointment.professional.field.set_cached_value(appointment, professional)
+        return appointment
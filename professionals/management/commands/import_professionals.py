@@ -0,0 +1,198 @@
+import csv
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.core.validators import validate_email
+from django.db import connection, transaction
+from django.utils import timezone
+from rest_framework import serializers
+
+from config.cache import invalidate_cache
+from professionals.models import CACHE_PREFIX, Professional, ZipcodeLocation
+from professionals.serializers import clean_phone, clean_zipcode
+
+IMPORT_FIELDS = [
+    "name",
+    "profession",
+    "street",
+    "number",
+    "complement",
+    "neighborhood",
+    "city",
+    "state",
+    "zipcode",
+    "phone",
+    "email",
+]
+OPTIONAL_FIELDS = {"complement"}
+STAGING_TABLE = "professional_import"
+
+
+def clean_email(value):
+    """Lower-case the email, like `ProfessionalSerializer.validate_email`."""
+    value = value.lower()
+    try:
+        validate_email(value)
+    except ValidationError:
+        raise serializers.ValidationError("Email inválido.")
+    return value
+
+
+class Command(BaseCommand):
+    help = (
+        "Import professionals from a CSV file, creating new ones and updating "
+        "the ones whose email already exists. Valid rows are streamed with "
+        "COPY into a staging table and upserted with a single INSERT ... ON "
+        "CONFLICT; rejected rows are written to an error report."
+    )
+
+    cleaners = {
+        "phone": clean_phone,
+        "zipcode": clean_zipcode,
+        "email": clean_email,
+    }
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Path of the CSV file")
+        parser.add_argument(
+            "--errors",
+            help="Path of the error report (default: <path>.errors.csv)",
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        errors_path = options["errors"] or f"{path}.errors.csv"
+        rejected = []
+        try:
+            with open(path, newline="", encoding="utf-8") as file:
+                reader = csv.DictReader(file)
+                required = set(IMPORT_FIELDS) - OPTIONAL_FIELDS
+                missing = sorted(required - set(reader.fieldnames or []))
+                if missing:
+                    raise CommandError(f"Missing columns: {', '.join(missing)}")
+                with transaction.atomic():
+                    results = self.load(self.clean_rows(reader, rejected))
+        except (OSError, UnicodeDecodeError, csv.Error) as error:
+            raise CommandError(f"Could not import {path}: {error}")
+
+        updated = [pk for pk, created in results if not created]
+        invalidate_cache(CACHE_PREFIX, *updated)
+
+        if rejected:
+            self.write_errors(errors_path, rejected)
+        message = (
+            f"{len(results) - len(updated)} professionals created, "
+            f"{len(updated)} updated, {len(rejected)} rejected."
+        )
+        if rejected:
+            message += f" Errors written to {errors_path}."
+        self.stdout.write(self.style.SUCCESS(message))
+
+    def clean_rows(self, rows, rejected):
+        """
+        Yield the cleaned values of each valid row, in `IMPORT_FIELDS` order
+        followed by the formatted address. Invalid rows, and repeated emails
+        (compared lower-cased, the first one wins), are appended to
+        `rejected` with their line number and errors.
+        """
+        max_lengths = {
+            name: Professional._meta.get_field(name).max_length
+            for name in IMPORT_FIELDS
+        }
+        professions = set(Professional.ProfessionChoices.values)
+        seen = set()
+
+        for row in rows:
+            data, errors = {}, {}
+            for name in IMPORT_FIELDS:
+                value = (row.get(name) or "").strip()
+                if not value and name not in OPTIONAL_FIELDS:
+                    errors[name] = "Campo obrigatório."
+                    continue
+                try:
+                    if name in self.cleaners:
+                        value = self.cleaners[name](value)
+                except serializers.ValidationError as error:
+                    errors[name] = str(error.detail[0])
+                    continue
+                if len(value) > max_lengths[name]:
+                    errors[name] = f"Máximo de {max_lengths[name]} caracteres."
+                    continue
+                data[name] = value
+
+            if "profession" in data and data["profession"] not in professions:
+                errors["profession"] = "Profissão inválida."
+            if "email" in data and not errors:
+                if data["email"] in seen:
+                    errors["email"] = "Email duplicado no arquivo."
+                seen.add(data["email"])
+
+            if errors:
+                # Line where the row ended, counting the header
+                rejected.append((row, errors, rows.line_num))
+                continue
+            full_address = Professional(**data).formatted_address()
+            yield [*(data[name] for name in IMPORT_FIELDS), full_address]
+
+    def load(self, rows):
+        """
+        COPY `rows` into a temporary table and upsert them on the email.
+        Coordinates come from a join with `ZipcodeLocation`.
+
+        Return the (id, created) of every imported professional.
+        """
+        quote = connection.ops.quote_name
+        table = quote(Professional._meta.db_table)
+        zipcodes = quote(ZipcodeLocation._meta.db_table)
+        names = [*IMPORT_FIELDS, "full_address"]
+        columns = [quote(name) for name in names]
+        updated_columns = [
+            quote(name)
+            for name in [*names, "updated_at", "latitude", "longitude"]
+            if name != "email"
+        ]
+        now = timezone.now()
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"CREATE TEMPORARY TABLE {STAGING_TABLE} "
+                f"({', '.join(f'{column} text' for column in columns)})"
+            )
+            with cursor.copy(
+                f"COPY {STAGING_TABLE} ({', '.join(columns)}) FROM STDIN"
+            ) as copy:
+                for row in rows:
+                    copy.write_row(row)
+
+            cursor.execute(
+                f"INSERT INTO {table} ({', '.join(columns)}, "
+                '"created_at", "updated_at", "latitude", "longitude") '
+                f"SELECT {', '.join(f'staging.{column}' for column in columns)}, "
+                "%s, %s, location.latitude, location.longitude "
+                f"FROM {STAGING_TABLE} staging "
+                f"LEFT JOIN {zipcodes} location "
+                'ON location."zipcode" = staging."zipcode" '
+                'ON CONFLICT ((lower("email"))) DO UPDATE SET '
+                + ", ".join(
+                    f"{column} = EXCLUDED.{column}" for column in updated_columns
+                )
+                # xmax is 0 only for rows inserted by this statement
+                + ' RETURNING "id", xmax = 0',
+                [now, now],
+            )
+            results = cursor.fetchall()
+            cursor.execute(f"DROP TABLE {STAGING_TABLE}")
+        return results
+
+    def write_errors(self, path, rejected):
+        with open(path, "w", newline="", encoding="utf-8") as file:
+            writer = csv.writer(file)
+            writer.writerow(["line", *IMPORT_FIELDS, "errors"])
+            for row, errors, line in rejected:
+                writer.writerow(
+                    [
+                        line,
+                        *(row.get(name) or "" for name in IMPORT_FIELDS),
+                        "; ".join(f"{name}: {error}" for name, error in errors.items()),
+                    ]
+                )
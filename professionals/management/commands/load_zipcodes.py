@@ -0,0 +1,76 @@
+import csv
+import re
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Subquery
+
+from config.cache import invalidate_cache
+from professionals.models import CACHE_PREFIX, Professional, ZipcodeLocation
+
+
+class Command(BaseCommand):
+    help = (
+        "Load CEP coordinates from a CSV file with the columns `cep`, "
+        "`latitude` and `longitude`, then update the coordinates of the "
+        "professionals."
+    )
+
+    batch_size = 5000
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Path of the CSV file")
+
+    def handle(self, *args, **options):
+        try:
+            with open(options["path"], newline="", encoding="utf-8") as file:
+                with transaction.atomic():
+                    loaded = self.load(csv.DictReader(file))
+                    geocoded = self.geocode_professionals()
+        except (OSError, KeyError, ValueError) as error:
+            raise CommandError(f"Could not load {options['path']}: {error}")
+
+        invalidate_cache(CACHE_PREFIX)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{loaded} CEPs loaded, {geocoded} professionals geocoded."
+            )
+        )
+
+    def load(self, rows):
+        loaded = 0
+        # Keyed by CEP: a batch can't update the same row twice.
+        batch = {}
+        for row in rows:
+            zipcode = re.sub(r"[^\d]", "", row["cep"])
+            if len(zipcode) != 8:
+                raise ValueError(f"invalid CEP {row['cep']!r}")
+            batch[zipcode] = ZipcodeLocation(
+                zipcode=zipcode,
+                latitude=float(row["latitude"]),
+                longitude=float(row["longitude"]),
+            )
+            if len(batch) == self.batch_size:
+                loaded += self.save(batch.values())
+                batch = {}
+        if batch:
+            loaded += self.save(batch.values())
+        return loaded
+
+    def save(self, batch):
+        batch = list(batch)
+        ZipcodeLocation.objects.bulk_create(
+            batch,
+            update_conflicts=True,
+            unique_fields=["zipcode"],
+            update_fields=["latitude", "longitude"],
+        )
+        return len(batch)
+
+    def geocode_professionals(self):
+        """Copy the coordinates to every professional with a known CEP."""
+        location = ZipcodeLocation.objects.filter(zipcode=OuterRef("zipcode"))
+        return Professional.objects.filter(Exists(location)).update(
+            latitude=Subquery(location.values("latitude")),
+            longitude=Subquery(location.values("longitude")),
+        )
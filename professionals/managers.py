@@ -0,0 +1,10 @@
+from django.db import models
+
+
+class ZipcodeLocationManager(models.Manager):
+    def locate(self, zipcode):
+        """
+        Return the (latitude, longitude) of a CEP (digits only), or None when
+        it is not in the dataset.
+        """
+        return self.filter(zipcode=zipcode).values_list("latitude", "longitude").first()
@@ -0,0 +1,63 @@
+# Generated by Django 5.2.6 on 2026-10-17 18:14
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("professionals", "0002_alter_professional_email_alter_professional_phone"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="WorkingHours",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "weekday",
+                    models.PositiveSmallIntegerField(
+                        choices=[
+                            (0, "Segunda-feira"),
+                            (1, "Terça-feira"),
+                            (2, "Quarta-feira"),
+                            (3, "Quinta-feira"),
+                            (4, "Sexta-feira"),
+                            (5, "Sábado"),
+                            (6, "Domingo"),
+                        ],
+                        verbose_name="Dia da semana",
+                    ),
+                ),
+                ("start_time", models.TimeField(verbose_name="Início")),
+                ("end_time", models.TimeField(verbose_name="Fim")),
+                (
+                    "professional",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="working_hours",
+                        to="professionals.professional",
+                        verbose_name="Profissional de saúde",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["weekday", "start_time"],
+                "constraints": [
+                    models.CheckConstraint(
+                        condition=models.Q(("end_time__gt", models.F("start_time"))),
+                        name="working_hours_end_after_start",
+                    )
+                ],
+            },
+        ),
+    ]
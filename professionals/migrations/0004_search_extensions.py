@@ -0,0 +1,36 @@
+# Generated by Django 5.2.6 on 2026-10-17 18:31
+
+from django.contrib.postgres.operations import TrigramExtension, UnaccentExtension
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("professionals", "0003_workinghours"),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        UnaccentExtension(),
+        # `unaccent()` is only STABLE (it depends on the search_path), so it
+        # cannot be used by generated columns or indexes as is.
+        migrations.RunSQL(
+            sql="""
+                CREATE FUNCTION immutable_unaccent(text) RETURNS text
+                AS $$ SELECT public.unaccent('public.unaccent'::regdictionary, $1) $$
+                LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT;
+            """,
+            reverse_sql="DROP FUNCTION immutable_unaccent(text);",
+        ),
+        migrations.RunSQL(
+            sql="""
+                CREATE TEXT SEARCH CONFIGURATION portuguese_unaccent
+                    (COPY = pg_catalog.portuguese);
+                ALTER TEXT SEARCH CONFIGURATION portuguese_unaccent
+                    ALTER MAPPING FOR hword, hword_part, word
+                    WITH public.unaccent, portuguese_stem;
+            """,
+            reverse_sql="DROP TEXT SEARCH CONFIGURATION portuguese_unaccent;",
+        ),
+    ]
@@ -0,0 +1,162 @@
+# Generated by Django 5.2.6 on 2026-10-17 18:31
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+import django.db.models.functions.text
+from django.db import migrations, models
+
+import professionals.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("professionals", "0004_search_extensions"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="professional",
+            name="search_text",
+            field=models.GeneratedField(
+                db_persist=True,
+                expression=professionals.models.ImmutableUnaccent(
+                    django.db.models.functions.text.Lower(
+                        django.db.models.functions.text.Concat(
+                            "name",
+                            models.Value(" "),
+                            models.Case(
+                                models.When(
+                                    profession="CLINICO_GERAL",
+                                    then=models.Value("Clínico Geral"),
+                                ),
+                                models.When(
+                                    profession="DERMATOLOGISTA",
+                                    then=models.Value("Dermatologista"),
+                                ),
+                                models.When(
+                                    profession="GINECOLOGISTA",
+                                    then=models.Value("Ginecologista"),
+                                ),
+                                models.When(
+                                    profession="PEDIATRA", then=models.Value("Pediatra")
+                                ),
+                                models.When(
+                                    profession="CARDIOLOGISTA",
+                                    then=models.Value("Cardiologista"),
+                                ),
+                                models.When(
+                                    profession="PSICOLOGO",
+                                    then=models.Value("Psicólogo"),
+                                ),
+                                models.When(
+                                    profession="ORTOPEDISTA",
+                                    then=models.Value("Ortopedista"),
+                                ),
+                                models.When(
+                                    profession="ENDOCRINOLOGISTA",
+                                    then=models.Value("Endocrinologista"),
+                                ),
+                                models.When(
+                                    profession="NEUROLOGISTA",
+                                    then=models.Value("Neurologista"),
+                                ),
+                                models.When(
+                                    profession="DENTISTA", then=models.Value("Dentista")
+                                ),
+                                default=models.Value(""),
+                            ),
+                            models.Value(" "),
+                            "neighborhood",
+                            models.Value(" "),
+                            "city",
+                        )
+                    )
+                ),
+                output_field=models.TextField(),
+            ),
+        ),
+        migrations.AddField(
+            model_name="professional",
+            name="search_vector",
+            field=models.GeneratedField(
+                db_persist=True,
+                expression=django.contrib.postgres.search.CombinedSearchVector(
+                    django.contrib.postgres.search.CombinedSearchVector(
+                        django.contrib.postgres.search.SearchVector(
+                            "name", config="portuguese_unaccent", weight="A"
+                        ),
+                        "||",
+                        django.contrib.postgres.search.SearchVector(
+                            models.Case(
+                                models.When(
+                                    profession="CLINICO_GERAL",
+                                    then=models.Value("Clínico Geral"),
+                                ),
+                                models.When(
+                                    profession="DERMATOLOGISTA",
+                                    then=models.Value("Dermatologista"),
+                                ),
+                                models.When(
+                                    profession="GINECOLOGISTA",
+                                    then=models.Value("Ginecologista"),
+                                ),
+                                models.When(
+                                    profession="PEDIATRA", then=models.Value("Pediatra")
+                                ),
+                                models.When(
+                                    profession="CARDIOLOGISTA",
+                                    then=models.Value("Cardiologista"),
+                                ),
+                                models.When(
+                                    profession="PSICOLOGO",
+                                    then=models.Value("Psicólogo"),
+                                ),
+                                models.When(
+                                    profession="ORTOPEDISTA",
+                                    then=models.Value("Ortopedista"),
+                                ),
+                                models.When(
+                                    profession="ENDOCRINOLOGISTA",
+                                    then=models.Value("Endocrinologista"),
+                                ),
+                                models.When(
+                                    profession="NEUROLOGISTA",
+                                    then=models.Value("Neurologista"),
+                                ),
+                                models.When(
+                                    profession="DENTISTA", then=models.Value("Dentista")
+                                ),
+                                default=models.Value(""),
+                            ),
+                            config="portuguese_unaccent",
+                            weight="A",
+                        ),
+                        django.contrib.postgres.search.SearchConfig(
+                            "portuguese_unaccent"
+                        ),
+                    ),
+                    "||",
+                    django.contrib.postgres.search.SearchVector(
+                        "neighborhood", "city", config="portuguese_unaccent", weight="B"
+                    ),
+                    django.contrib.postgres.search.SearchConfig("portuguese_unaccent"),
+                ),
+                output_field=django.contrib.postgres.search.SearchVectorField(),
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="professional",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["search_vector"], name="professional_search_gin"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="professional",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["search_text"],
+                name="professional_search_trgm",
+                opclasses=["gin_trgm_ops"],
+            ),
+        ),
+    ]
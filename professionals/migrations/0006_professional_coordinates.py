@@ -0,0 +1,45 @@
+# Generated by Django 5.2.6 on 2026-10-17 18:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("professionals", "0005_professional_search"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ZipcodeLocation",
+            fields=[
+                (
+                    "zipcode",
+                    models.CharField(
+                        max_length=8,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="CEP",
+                    ),
+                ),
+                ("latitude", models.FloatField()),
+                ("longitude", models.FloatField()),
+            ],
+        ),
+        migrations.AddField(
+            model_name="professional",
+            name="latitude",
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name="professional",
+            name="longitude",
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name="professional",
+            index=models.Index(
+                fields=["latitude", "longitude"], name="professional_coordinates_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.6 on 2026-10-17 18:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("professionals", "0006_professional_coordinates"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="professional",
+            name="full_address",
+            field=models.TextField(
+                default="", editable=False, verbose_name="Endereço completo"
+            ),
+        ),
+    ]
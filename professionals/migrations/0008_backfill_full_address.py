@@ -0,0 +1,46 @@
+# Generated by Django 5.2.6 on 2026-10-17 18:44
+
+from django.db import migrations, models
+from django.db.models.functions import Concat
+
+
+def backfill_full_address(apps, schema_editor):
+    # Same format as `Address.formatted_address()`, computed by the database
+    # in a single UPDATE instead of loading every row.
+    Professional = apps.get_model("professionals", "Professional")
+    complement = models.Case(
+        models.When(
+            models.Q(complement__isnull=True) | models.Q(complement=""),
+            then=models.Value(""),
+        ),
+        default=Concat(models.Value(" "), "complement"),
+    )
+    Professional.objects.update(
+        full_address=Concat(
+            "street",
+            models.Value(", "),
+            "number",
+            models.Value(" "),
+            complement,
+            models.Value(" - "),
+            "neighborhood",
+            models.Value(", "),
+            "city",
+            models.Value(", "),
+            "state",
+            models.Value(". CEP:"),
+            "zipcode",
+            output_field=models.TextField(),
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("professionals", "0007_professional_full_address"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_full_address, migrations.RunPython.noop),
+    ]
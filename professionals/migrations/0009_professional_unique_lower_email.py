@@ -0,0 +1,48 @@
+# Generated by Django 5.2.6 on 2026-10-17 19:10
+
+import django.db.models.functions.text
+from django.db import migrations, models
+from django.db.models.functions import Lower
+
+
+def check_case_duplicate_emails(apps, schema_editor):
+    # The email was unique case-sensitively: rows differing only in case
+    # would make the constraint fail with a bare IntegrityError.
+    Professional = apps.get_model("professionals", "Professional")
+    duplicates = list(
+        Professional.objects.values(lower_email=Lower("email"))
+        .annotate(count=models.Count("pk"))
+        .filter(count__gt=1)
+        .order_by("lower_email")
+        .values_list("lower_email", flat=True)
+    )
+    if duplicates:
+        raise RuntimeError(
+            "Cannot make the professional email unique regardless of case: "
+            f"{len(duplicates)} emails are used by more than one professional "
+            f"({', '.join(duplicates[:10])}). Merge or change these "
+            "professionals, then run the migration again."
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("professionals", "0008_backfill_full_address"),
+    ]
+
+    operations = [
+        migrations.RunPython(check_case_duplicate_emails, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name="professional",
+            name="email",
+            field=models.EmailField(max_length=254, verbose_name="Email"),
+        ),
+        migrations.AddConstraint(
+            model_name="professional",
+            constraint=models.UniqueConstraint(
+                django.db.models.functions.text.Lower("email"),
+                name="unique_professional_lower_email",
+            ),
+        ),
+    ]
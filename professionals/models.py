@@ -1,4 +1,38 @@
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector, SearchVectorField
 from django.db import models
+from django.db.models.functions import Concat, Lower
+
+from .managers import ZipcodeLocationManager
+
+# Text search configuration created in migration 0004: the Portuguese
+# stemmer preceded by `unaccent`, so "psicologo" matches "Psicólogo".
+SEARCH_CONFIG = "portuguese_unaccent"
+
+# Prefix of the cached professional responses (see `config.cache`), shared
+# by the views and by the code invalidating them.
+CACHE_PREFIX = "professionals"
+
+
+class ImmutableUnaccent(models.Func):
+    """
+    `unaccent()` wrapped in an IMMUTABLE SQL function (created in migration
+    0004), so it can be used by generated columns and indexes.
+    """
+
+    function = "immutable_unaccent"
+    output_field = models.TextField()
+
+
+def choice_label(field, choices):
+    """SQL expression returning the display label of a choices field."""
+    return models.Case(
+        *[
+            models.When(**{field: value}, then=models.Value(label))
+            for value, label in choices
+        ],
+        default=models.Value(""),
+    )
 
 
 class Address(models.Model):
@@ -23,6 +57,9 @@ class Address(models.Model):
         return f"{street_part} - {city_part}. CEP:{self.zipcode}"
 
 
+ADDRESS_FIELDS = {field.name for field in Address._meta.fields}
+
+
 class Professional(Address):
     class ProfessionChoices(models.TextChoices):
         GENERAL_PRACTITIONER = "CLINICO_GERAL", "Clínico Geral"
@@ -42,9 +79,139 @@ class Professional(Address):
         verbose_name="Profissão", max_length=50, choices=ProfessionChoices.choices
     )
     phone = models.CharField(verbose_name="Telefone", max_length=20)
-    email = models.EmailField(verbose_name="Email", unique=True)
+    # Unique regardless of case, see `Meta.constraints`
+    email = models.EmailField(verbose_name="Email")
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # `formatted_address()`, stored on save so reads don't rebuild it.
+    full_address = models.TextField(
+        verbose_name="Endereço completo", editable=False, default=""
+    )
+    # Coordinates of the CEP, computed on save from `ZipcodeLocation`.
+    latitude = models.FloatField(null=True, blank=True, editable=False)
+    longitude = models.FloatField(null=True, blank=True, editable=False)
+
+    # Searchable columns, maintained by the database on every write.
+    search_vector = models.GeneratedField(
+        expression=(
+            SearchVector("name", weight="A", config=SEARCH_CONFIG)
+            + SearchVector(
+                choice_label("profession", ProfessionChoices.choices),
+                weight="A",
+                config=SEARCH_CONFIG,
+            )
+            + SearchVector("neighborhood", "city", weight="B", config=SEARCH_CONFIG)
+        ),
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
+    # Lower-cased, unaccented text used by the trigram (typo tolerant) search.
+    search_text = models.GeneratedField(
+        expression=ImmutableUnaccent(
+            Lower(
+                Concat(
+                    "name",
+                    models.Value(" "),
+                    choice_label("profession", ProfessionChoices.choices),
+                    models.Value(" "),
+                    "neighborhood",
+                    models.Value(" "),
+                    "city",
+                )
+            )
+        ),
+        output_field=models.TextField(),
+        db_persist=True,
+    )
+
+    class Meta:
+        indexes = [
+            GinIndex(fields=["search_vector"], name="professional_search_gin"),
+            GinIndex(
+                fields=["search_text"],
+                name="professional_search_trgm",
+                opclasses=["gin_trgm_ops"],
+            ),
+            models.Index(
+                fields=["latitude", "longitude"], name="professional_coordinates_idx"
+            ),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                Lower("email"), name="unique_professional_lower_email"
+            ),
+        ]
 
     def __str__(self):
         return self.name
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get("update_fields")
+        derived_fields = set()
+        if update_fields is None or not ADDRESS_FIELDS.isdisjoint(update_fields):
+            self.full_address = self.formatted_address()
+            derived_fields.add("full_address")
+        if update_fields is None or "zipcode" in update_fields:
+            # Subqueries evaluated by the INSERT/UPDATE itself, so saving
+            # costs no extra query.
+            location = ZipcodeLocation.objects.filter(zipcode=self.zipcode)
+            self.latitude = models.Subquery(location.values("latitude"))
+            self.longitude = models.Subquery(location.values("longitude"))
+            derived_fields.update(["latitude", "longitude"])
+        if update_fields is not None:
+            kwargs["update_fields"] = {*update_fields, *derived_fields}
+        super().save(*args, **kwargs)
+        if "latitude" in derived_fields:
+            # Defer the saved coordinates: they are loaded on access.
+            del self.latitude, self.longitude
+
+
+class ZipcodeLocation(models.Model):
+    """
+    Coordinates of a CEP, loaded from a local dataset with the
+    `load_zipcodes` command.
+    """
+
+    zipcode = models.CharField(verbose_name="CEP", max_length=8, primary_key=True)
+    latitude = models.FloatField()
+    longitude = models.FloatField()
+
+    objects = ZipcodeLocationManager()
+
+    def __str__(self):
+        return self.zipcode
+
+
+class WorkingHours(models.Model):
+    class Weekday(models.IntegerChoices):
+        MONDAY = 0, "Segunda-feira"
+        TUESDAY = 1, "Terça-feira"
+        WEDNESDAY = 2, "Quarta-feira"
+        THURSDAY = 3, "Quinta-feira"
+        FRIDAY = 4, "Sexta-feira"
+        SATURDAY = 5, "Sábado"
+        SUNDAY = 6, "Domingo"
+
+    professional = models.ForeignKey(
+        to=Professional,
+        verbose_name="Profissional de saúde",
+        related_name="working_hours",
+        on_delete=models.CASCADE,
+    )
+    weekday = models.PositiveSmallIntegerField(
+        verbose_name="Dia da semana", choices=Weekday.choices
+    )
+    start_time = models.TimeField(verbose_name="Início")
+    end_time = models.TimeField(verbose_name="Fim")
+
+    class Meta:
+        ordering = ["weekday", "start_time"]
+        constraints = [
+            models.CheckConstraint(
+                condition=models.Q(end_time__gt=models.F("start_time")),
+                name="working_hours_end_after_start",
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.get_weekday_display()} {self.start_time}-{self.end_time}"
@@ -1,8 +1,45 @@
+import datetime
 import re
 
+from django.db import IntegrityError, transaction
+from django.utils import timezone
 from rest_framework import serializers
 
-from .models import Professional
+from .models import Professional, WorkingHours, ZipcodeLocation
+
+EMAIL_CONSTRAINT = "unique_professional_lower_email"
+
+
+def clean_phone(value):
+    """
+    Validate and clean phone number.
+
+    Ensures the number has 10 or 11 digits (DDD + local number)
+    and removes non-digit characters.
+    Raises ValidationError if the length is incorrect.
+    """
+    clean_value = re.sub(r"[^\d]", "", value)
+
+    if len(clean_value) < 10:  # DDD code + 8 digits
+        raise serializers.ValidationError("O número de telefone é muito curto")
+    if len(clean_value) > 11:  # DDD code + 9 digits
+        raise serializers.ValidationError("O número de telefone é muito longo")
+
+    return clean_value
+
+
+def clean_zipcode(value):
+    """
+    Validate and clean zipcode (CEP).
+
+    Ensures the zipcode has exactly 8 digits. Removes non-digit characters.
+    Raises ValidationError if the length is incorrect.
+    """
+    clean_value = re.sub(r"[^\d]", "", value)
+
+    if len(clean_value) != 8:
+        raise serializers.ValidationError("Formato de CEP inválido.")
+    return clean_value
 
 
 class ProfessionalSerializer(serializers.ModelSerializer):
@@ -42,12 +79,73 @@ class ProfessionalSerializer(serializers.ModelSerializer):
             "email": {"write_only": True},
         }
 
+    # Columns read by the method fields, for the `.values()` read path
+    values_sources = {"address": ["full_address"], "contact": ["phone", "email"]}
+
+    @classmethod
+    def setup_eager_loading(cls, queryset):
+        """
+        Select only the columns rendered by this serializer: the readable
+        model fields, plus the ones `address` and `contact` come from.
+        """
+        model_fields = {field.name for field in Professional._meta.concrete_fields}
+        write_only = {
+            name
+            for name, kwargs in cls.Meta.extra_kwargs.items()
+            if kwargs.get("write_only")
+        }
+        fields = [
+            name
+            for name in cls.Meta.fields
+            if name in model_fields and name not in write_only
+        ]
+        return queryset.only(*fields, "full_address", "phone", "email")
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        self.represent_annotations(instance, data)
+        return data
+
+    def represent_annotations(self, instance, data):
+        # Annotated by the `near` filter
+        if hasattr(instance, "distance_km"):
+            data["distance_km"] = round(instance.distance_km, 2)
+
     def get_address(self, obj):
-        return obj.formatted_address()
+        return obj.full_address
 
     def get_contact(self, obj):
         return {"phone": obj.phone, "email": obj.email}
 
+    def create(self, validated_data):
+        try:
+            with transaction.atomic():
+                return super().create(validated_data)
+        except IntegrityError as error:
+            self.raise_if_email_exists(error)
+            raise
+
+    def update(self, instance, validated_data):
+        try:
+            with transaction.atomic():
+                return super().update(instance, validated_data)
+        except IntegrityError as error:
+            self.raise_if_email_exists(error)
+            raise
+
+    def raise_if_email_exists(self, error):
+        """
+        Translate a violation of the case-insensitive email constraint into
+        the error DRF's `UniqueValidator` used to return, without its query.
+        """
+        if EMAIL_CONSTRAINT in str(error):
+            field = Professional._meta.get_field("email")
+            message = field.error_messages["unique"] % {
+                "model_name": Professional._meta.verbose_name,
+                "field_label": field.verbose_name,
+            }
+            raise serializers.ValidationError({"email": [message]})
+
     def validate_name(self, value):
         """Strip leading and trailing whitespace from the name."""
         return value.strip()
@@ -57,34 +155,10 @@ class ProfessionalSerializer(serializers.ModelSerializer):
         return value.lower().strip()
 
     def validate_phone(self, value):
-        """
-        Validate and clean phone number.
-
-        Ensures the number has 10 or 11 digits (DDD + local number)
-        and removes non-digit characters.
-        Raises ValidationError if the length is incorrect.
-        """
-        clean_value = re.sub(r"[^\d]", "", value)
-
-        if len(clean_value) < 10:  # DDD code + 8 digits
-            raise serializers.ValidationError("O número de telefone é muito curto")
-        if len(clean_value) > 11:  # DDD code + 9 digits
-            raise serializers.ValidationError("O número de telefone é muito longo")
-
-        return clean_value
+        return clean_phone(value)
 
     def validate_zipcode(self, value):
-        """
-        Validate and clean zipcode (CEP).
-
-        Ensures the zipcode has exactly 8 digits. Removes non-digit characters.
-        Raises ValidationError if the length is incorrect.
-        """
-        clean_value = re.sub(r"[^\d]", "", value)
-
-        if len(clean_value) != 8:
-            raise serializers.ValidationError("Formato de CEP inválido.")
-        return clean_value
+        return clean_zipcode(value)
 
 
 class PartialProfessionalSerializer(serializers.ModelSerializer):
@@ -92,3 +166,150 @@ class PartialProfessionalSerializer(serializers.ModelSerializer):
         model = Professional
         fields = ["id", "name", "profession"]
         read_only_fields = ["id", "name", "profession"]
+
+
+class WorkingHoursListSerializer(serializers.ListSerializer):
+    def validate(self, attrs):
+        """Reject intervals that overlap on the same weekday."""
+        intervals = sorted(
+            (item["weekday"], item["start_time"], item["end_time"]) for item in attrs
+        )
+        for previous, current in zip(intervals, intervals[1:]):
+            if previous[0] == current[0] and current[1] < previous[2]:
+                raise serializers.ValidationError(
+                    "Os horários de atendimento não podem se sobrepor."
+                )
+        return attrs
+
+
+class WorkingHoursSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = WorkingHours
+        fields = ["weekday", "start_time", "end_time"]
+        list_serializer_class = WorkingHoursListSerializer
+
+    def validate(self, attrs):
+        if attrs["end_time"] <= attrs["start_time"]:
+            raise serializers.ValidationError(
+                "O horário de término deve ser depois do horário de início."
+            )
+        return attrs
+
+
+class DateRangeQuerySerializer(serializers.Serializer):
+    """
+    Validate `from` and `to` query parameters: dates (inclusive) in the
+    server timezone, limited to `max_days`.
+
+    The validated data also carries `start_at` and `end_at`, the aware
+    datetimes bounding the period as a half-open range.
+    """
+
+    max_days = 62
+    default_days = 7
+
+    def get_fields(self):
+        # "from" is a reserved word, so these fields can't be declared as
+        # class attributes.
+        fields = super().get_fields()
+        fields["from"] = serializers.DateField(required=False)
+        fields["to"] = serializers.DateField(required=False)
+        return fields
+
+    def validate(self, attrs):
+        start = attrs.get("from") or timezone.localdate()
+        end = attrs.get("to") or start + datetime.timedelta(days=self.default_days - 1)
+        if end < start:
+            raise serializers.ValidationError(
+                {"to": "A data final deve ser igual ou posterior à data inicial."}
+            )
+        if (end - start).days >= self.max_days:
+            raise serializers.ValidationError(
+                {"to": f"O período não pode ser maior que {self.max_days} dias."}
+            )
+        tz = timezone.get_current_timezone()
+        attrs["from"] = start
+        attrs["to"] = end
+        attrs["start_at"] = timezone.make_aware(
+            datetime.datetime.combine(start, datetime.time.min), tz
+        )
+        attrs["end_at"] = timezone.make_aware(
+            datetime.datetime.combine(
+                end + datetime.timedelta(days=1), datetime.time.min
+            ),
+            tz,
+        )
+        return attrs
+
+
+class AvailabilityQuerySerializer(DateRangeQuerySerializer):
+    """
+    Validate the query parameters of the availability endpoint. `slot` is
+    the slot length in minutes or hours, e.g. `30m` or `1h`.
+    """
+
+    slot = serializers.CharField(default="30m")
+
+    def validate_slot(self, value):
+        match = re.fullmatch(r"(\d+)(m|h)", value.strip().lower())
+        if not match:
+            raise serializers.ValidationError(
+                "Formato de slot inválido. Use minutos ou horas, ex.: 30m ou 1h."
+            )
+        amount, unit = match.groups()
+        minutes = int(amount) * (60 if unit == "h" else 1)
+        if not 5 <= minutes <= 12 * 60:
+            raise serializers.ValidationError(
+                "O slot deve ter entre 5 minutos e 12 horas."
+            )
+        return datetime.timedelta(minutes=minutes)
+
+
+class ProximityQuerySerializer(serializers.Serializer):
+    """
+    Validate the `near` (CEP) and `radius_km` query parameters of the
+    proximity search. The validated data also carries the `latitude` and
+    `longitude` of the CEP.
+    """
+
+    near = serializers.CharField()
+    radius_km = serializers.FloatField(default=10, min_value=0.1, max_value=100)
+
+    def validate_near(self, value):
+        return clean_zipcode(value)
+
+    def validate(self, attrs):
+        location = ZipcodeLocation.objects.locate(attrs["near"])
+        if location is None:
+            raise serializers.ValidationError({"near": "CEP não encontrado."})
+        attrs["latitude"], attrs["longitude"] = location
+        return attrs
+
+
+class FacetsQuerySerializer(serializers.Serializer):
+    """
+    Validate the `facets` query parameter: comma separated names of the
+    columns to count, all of them by default.
+    """
+
+    choices = ["profession", "state", "city"]
+
+    facets = serializers.CharField(default=",".join(choices))
+
+    def validate_facets(self, value):
+        facets = list(dict.fromkeys(name.strip() for name in value.split(",")))
+        invalid = [name for name in facets if name not in self.choices]
+        if invalid or not facets:
+            raise serializers.ValidationError(
+                f"Facetas inválidas. Use: {', '.join(self.choices)}."
+            )
+        return facets
+
+
+class UpcomingAppointmentsQuerySerializer(serializers.Serializer):
+    """
+    Validate the `limit` query parameter: number of upcoming appointments
+    embedded per professional with `?include=upcoming_appointments`.
+    """
+
+    limit = serializers.IntegerField(default=5, min_value=1, max_value=50)
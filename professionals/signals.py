@@ -0,0 +1,16 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from config.cache import invalidate_cache
+
+from .models import CACHE_PREFIX, Professional
+
+
+@receiver([post_save, post_delete], sender=Professional)
+def invalidate_professional_cache(sender, instance=None, **kwargs):
+    # After the commit: bumped inside the transaction, the new version could
+    # be used to cache the old rows, read by a concurrent request.
+    transaction.on_commit(partial(invalidate_cache, CACHE_PREFIX, instance.pk))
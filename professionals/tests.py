@@ -1,10 +1,30 @@
+import csv
+import datetime
+import io
+import json
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from asgiref.sync import iscoroutinefunction
 from django.contrib.auth import get_user_model
-from django.urls import reverse
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import SimpleTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve, reverse
+from django.utils import timezone
 from rest_framework import status
 from rest_framework.authtoken.models import Token
+from rest_framework.renderers import JSONRenderer
 from rest_framework.test import APITestCase
 
-from .models import Professional
+from appointments.models import Appointment
+
+from .availability import free_slots
+from .models import Professional, WorkingHours, ZipcodeLocation
+from .serializers import ProfessionalSerializer
 
 User = get_user_model()
 
@@ -94,6 +114,92 @@ class ProfessionalApiTest(APITestCase):
         for field in self.write_only_fields:
             self.assertNotIn(field, response.data)
 
+    def test_list_and_retrieve_render_like_the_serializer(self):
+        expected = ProfessionalSerializer(self.professional).data
+        response = self.client.get(self.list_url)
+        self.assertEqual(
+            JSONRenderer().render(response.data["results"]),
+            JSONRenderer().render([expected]),
+        )
+        response = self.client.get(self.detail_url)
+        self.assertEqual(response.content, JSONRenderer().render(expected))
+
+    def test_list_professionals_query_budget(self):
+        # token, conditional GET fingerprint, count, page of professionals
+        with self.assertNumQueries(4):
+            response = self.client.get(self.list_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_list_professionals_selects_rendered_columns(self):
+        self.assertEqual(
+            self.professional.full_address,
+            self.professional.formatted_address(),
+        )
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.list_url)
+        self.assertEqual(
+            response.data["results"][0]["address"],
+            "Rua das Couves, 123  Ap. 4 - Centro, Rio de Janeiro, RJ. CEP:12345678",
+        )
+        page_query = queries.captured_queries[-1]["sql"]
+        self.assertIn('"full_address"', page_query)
+        for column in ["street", "zipcode", "search_vector", "latitude"]:
+            self.assertNotIn(f'"{column}"', page_query)
+
+    def test_list_professionals_sparse_fields(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.list_url, {"fields": "id,name,profession"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.data["results"],
+            [
+                {
+                    "id": self.professional.id,
+                    "name": "Alice dos Santos",
+                    "profession": self.professional.profession,
+                }
+            ],
+        )
+        page_query = queries.captured_queries[-1]["sql"]
+        for column in ["full_address", "phone", "email", "created_at"]:
+            self.assertNotIn(f'"{column}"', page_query)
+
+    def test_retrieve_professional_sparse_fields(self):
+        response = self.client.get(self.detail_url, {"fields": "name,contact"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(list(response.data), ["name", "contact"])
+
+    def test_list_professionals_rejects_unknown_fields(self):
+        response = self.client.get(self.list_url, {"fields": "name,email"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("fields", response.data)
+
+    def test_retrieve_professional_query_budget(self):
+        # token, professional
+        with self.assertNumQueries(2):
+            response = self.client.get(self.detail_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_retrieve_professional_not_modified(self):
+        etag = self.client.get(self.detail_url)["ETag"]
+        response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self.client.patch(self.detail_url, {"name": "Alice Souza"}, format="json")
+        response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["name"], "Alice Souza")
+
+    def test_list_professionals_not_modified(self):
+        etag = self.client.get(self.list_url)["ETag"]
+        response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self.client.delete(self.detail_url)
+        response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["count"], 0)
+
     def test_retrieve_professional_not_found(self):
         url = reverse("professional-detail", args=[999])
         response = self.client.get(url)
@@ -165,6 +271,22 @@ class ProfessionalApiTest(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
         self.assertEqual(Professional.objects.count(), 1)
 
+    def test_create_professional_rejects_existing_email_in_other_case(self):
+        data = self.make_professional_data(email="ALICE@example.com")
+        response = self.client.post(self.list_url, data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            response.data["email"], ["professional with this Email already exists."]
+        )
+        self.assertEqual(Professional.objects.count(), 1)
+
+    def test_create_professional_query_budget(self):
+        # token, savepoint, INSERT (coordinates included), release
+        data = self.make_professional_data(email="bruno@example.com")
+        with self.assertNumQueries(4):
+            response = self.client.post(self.list_url, data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
     def test_update_professional(self):
         data = {"profession": "PSICOLOGO"}
         response = self.client.patch(self.detail_url, data, format="json")
@@ -172,6 +294,15 @@ class ProfessionalApiTest(APITestCase):
         self.professional.refresh_from_db()
         self.assertEqual(self.professional.profession, "PSICOLOGO")
 
+    def test_update_address_updates_full_address(self):
+        data = {"street": "Rua das Flores", "complement": ""}
+        response = self.client.patch(self.detail_url, data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        expected = "Rua das Flores, 123  - Centro, Rio de Janeiro, RJ. CEP:12345678"
+        self.assertEqual(response.data["address"], expected)
+        self.professional.refresh_from_db()
+        self.assertEqual(self.professional.full_address, expected)
+
     def test_update_professional_with_no_data_changes_nothing(self):
         response = self.client.patch(self.detail_url, {}, format="json")
         self.assertEqual(response.status_code, status.HTTP_200_OK)
@@ -373,6 +504,42 @@ class ProfessionalApiTest(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
         self.assertEqual(Professional.objects.count(), 0)
 
+    def test_delete_professional_cascades_in_the_database(self):
+        Appointment.objects.bulk_create(
+            Appointment(
+                professional=self.professional,
+                scheduled_at=timezone.now() + datetime.timedelta(hours=hour),
+            )
+            for hour in range(1, 6)
+        )
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.delete(self.detail_url)
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(Appointment.objects.count(), 0)
+        # The appointments are never loaded nor deleted one by one.
+        table = Appointment._meta.db_table
+        for query in queries.captured_queries:
+            self.assertNotIn(table, query["sql"])
+
+    def test_appointment_foreign_key_cascades_on_delete(self):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT tc.constraint_name, rc.delete_rule
+                FROM information_schema.table_constraints tc
+                JOIN information_schema.referential_constraints rc
+                    USING (constraint_schema, constraint_name)
+                JOIN information_schema.key_column_usage kcu
+                    USING (constraint_schema, constraint_name)
+                WHERE tc.table_name = %s AND kcu.column_name = %s
+                """,
+                [Appointment._meta.db_table, "professional_id"],
+            )
+            rows = cursor.fetchall()
+        self.assertEqual(
+            rows, [("appointments_appointment_professional_id_fk_cascade", "CASCADE")]
+        )
+
     def test_delete_professional_not_found(self):
         url = reverse("professional-detail", args=[999])
         response = self.client.delete(url)
@@ -408,3 +575,919 @@ class ProfessionalApiTest(APITestCase):
         self.client.credentials()
         response = self.client.delete(self.detail_url)
         self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class ProfessionalAvailabilityTest(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email="test@example.com", password="testpass"
+        )
+
+        self.token = Token.objects.get(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token.key}")
+
+        self.professional = Professional.objects.create(
+            name="Alice dos Santos",
+            profession=Professional.ProfessionChoices.GENERAL_PRACTITIONER,
+            street="Rua das Couves",
+            number="123",
+            complement="Ap. 4",
+            neighborhood="Centro",
+            city="Rio de Janeiro",
+            state="RJ",
+            zipcode="12345678",
+            phone="2111112222",
+            email="alice@example.com",
+        )
+        WorkingHours.objects.create(
+            professional=self.professional,
+            weekday=WorkingHours.Weekday.MONDAY,
+            start_time=datetime.time(9),
+            end_time=datetime.time(12),
+        )
+
+        today = timezone.localdate()
+        self.monday = today + datetime.timedelta(days=7 - today.weekday())
+        self.url = reverse("professional-availability", args=[self.professional.id])
+        self.working_hours_url = reverse(
+            "professional-working-hours", args=[self.professional.id]
+        )
+
+    def local_datetime(self, hour, minute=0):
+        return timezone.make_aware(
+            datetime.datetime.combine(self.monday, datetime.time(hour, minute))
+        )
+
+    def test_availability_excludes_booked_slots(self):
+        Appointment.objects.create(
+            professional=self.professional, scheduled_at=self.local_datetime(10)
+        )
+        Appointment.objects.create(
+            professional=self.professional, scheduled_at=self.local_datetime(10, 15)
+        )
+        other_professional = Professional.objects.create(
+            name="Maria da Silva",
+            profession=Professional.ProfessionChoices.GYNECOLOGIST,
+            street="Rua das Couves",
+            number="123",
+            neighborhood="Centro",
+            city="Rio de Janeiro",
+            state="RJ",
+            zipcode="12345678",
+            phone="2111112222",
+            email="maria@example.com",
+        )
+        Appointment.objects.create(
+            professional=other_professional, scheduled_at=self.local_datetime(9)
+        )
+
+        # token, professional, working hours, appointments in the period
+        with self.assertNumQueries(4):
+            response = self.client.get(
+                self.url,
+                {
+                    "from": self.monday.isoformat(),
+                    "to": (self.monday + datetime.timedelta(days=6)).isoformat(),
+                    "slot": "30m",
+                },
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["slot_minutes"], 30)
+        self.assertEqual(
+            response.data["slots"],
+            [
+                self.local_datetime(9),
+                self.local_datetime(9, 30),
+                self.local_datetime(11),
+                self.local_datetime(11, 30),
+            ],
+        )
+
+    def test_availability_with_hour_slots(self):
+        response = self.client.get(
+            self.url, {"from": self.monday.isoformat(), "slot": "1h"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.data["slots"],
+            [
+                self.local_datetime(9),
+                self.local_datetime(10),
+                self.local_datetime(11),
+            ],
+        )
+
+    def test_availability_rejects_invalid_parameters(self):
+        response = self.client.get(self.url, {"slot": "30 minutos"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("slot", response.data)
+
+        response = self.client.get(
+            self.url,
+            {
+                "from": self.monday.isoformat(),
+                "to": (self.monday - datetime.timedelta(days=1)).isoformat(),
+            },
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("to", response.data)
+
+        response = self.client.get(
+            self.url,
+            {
+                "from": self.monday.isoformat(),
+                "to": (self.monday + datetime.timedelta(days=365)).isoformat(),
+            },
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("to", response.data)
+
+    def test_availability_not_found(self):
+        url = reverse("professional-availability", args=[999])
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_replace_working_hours(self):
+        data = [
+            {"weekday": 1, "start_time": "08:00", "end_time": "12:00"},
+            {"weekday": 1, "start_time": "13:00", "end_time": "17:00"},
+        ]
+        response = self.client.put(self.working_hours_url, data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 2)
+        self.assertEqual(
+            list(self.professional.working_hours.values_list("weekday", flat=True)),
+            [1, 1],
+        )
+
+        response = self.client.get(self.working_hours_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data[0]["start_time"], "08:00:00")
+
+    def test_replace_working_hours_rejects_invalid_intervals(self):
+        overlapping = [
+            {"weekday": 1, "start_time": "08:00", "end_time": "12:00"},
+            {"weekday": 1, "start_time": "11:00", "end_time": "17:00"},
+        ]
+        response = self.client.put(self.working_hours_url, overlapping, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        inverted = [{"weekday": 1, "start_time": "12:00", "end_time": "08:00"}]
+        response = self.client.put(self.working_hours_url, inverted, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.professional.working_hours.count(), 1)
+
+
+class FreeSlotsTest(SimpleTestCase):
+    def test_free_slots_skips_past_slots_and_booked_slots(self):
+        monday = datetime.date(2030, 1, 7)
+        tz = timezone.get_current_timezone()
+
+        def at(hour, minute=0):
+            return timezone.make_aware(
+                datetime.datetime.combine(monday, datetime.time(hour, minute)), tz
+            )
+
+        working_hours = [
+            (0, datetime.time(8), datetime.time(10)),
+            (0, datetime.time(14), datetime.time(15)),
+        ]
+        slots = free_slots(
+            working_hours,
+            booked=[at(9, 10), at(14)],
+            start_date=monday,
+            end_date=monday + datetime.timedelta(days=6),
+            slot=datetime.timedelta(minutes=30),
+            now=at(8, 1),
+        )
+        self.assertEqual(slots, [at(8, 30), at(14, 30)])
+
+
+class ProfessionalExportTest(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email="test@example.com", password="testpass"
+        )
+
+        self.token = Token.objects.get(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token.key}")
+
+        for index in range(3):
+            Professional.objects.create(
+                name=f"Profissional {index}",
+                profession=Professional.ProfessionChoices.GENERAL_PRACTITIONER,
+                street="Rua das Couves",
+                number="123",
+                neighborhood="Centro",
+                city="Rio de Janeiro",
+                state="RJ",
+                zipcode="12345678",
+                phone="2111112222",
+                email=f"profissional{index}@example.com",
+            )
+        self.url = reverse("professional-export")
+
+    def test_export_professionals_as_csv(self):
+        response = self.client.get(self.url, {"output": "csv"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        content = b"".join(response.streaming_content).decode()
+        rows = list(csv.reader(io.StringIO(content)))
+        self.assertEqual(rows[0][:3], ["id", "name", "profession"])
+        self.assertEqual(
+            [row[1] for row in rows[1:]],
+            [
+                "Profissional 0",
+                "Profissional 1",
+                "Profissional 2",
+            ],
+        )
+
+    def test_export_professionals_as_ndjson(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual(len(lines), 3)
+        self.assertEqual(json.loads(lines[0])["email"], "profissional0@example.com")
+
+
+@override_settings(CACHE_RESPONSES=True)
+class ProfessionalCacheTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            email="test@example.com", password="testpass"
+        )
+
+        self.token = Token.objects.get(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token.key}")
+
+        self.professional = Professional.objects.create(
+            name="Alice dos Santos",
+            profession=Professional.ProfessionChoices.GENERAL_PRACTITIONER,
+            street="Rua das Couves",
+            number="123",
+            complement="Ap. 4",
+            neighborhood="Centro",
+            city="Rio de Janeiro",
+            state="RJ",
+            zipcode="12345678",
+            phone="2111112222",
+            email="alice@example.com",
+        )
+        self.list_url = reverse("professional-list")
+        self.detail_url = reverse("professional-detail", args=[self.professional.id])
+
+    def test_list_professionals_is_cached(self):
+        response = self.client.get(self.list_url)
+        self.assertEqual(response["X-Cache"], "MISS")
+
+        # none: the token is cached too
+        with self.assertNumQueries(0):
+            cached = self.client.get(self.list_url)
+        self.assertEqual(cached["X-Cache"], "HIT")
+        self.assertEqual(cached.data, response.data)
+        self.assertEqual(cached["ETag"], response["ETag"])
+
+    def test_list_professionals_cache_is_keyed_by_query_params(self):
+        self.client.get(self.list_url)
+        response = self.client.get(self.list_url, {"page": 1})
+        self.assertEqual(response["X-Cache"], "MISS")
+        response = self.client.get(self.list_url, {"page": 2})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_retrieve_professional_is_cached(self):
+        self.assertEqual(self.client.get(self.detail_url)["X-Cache"], "MISS")
+        with self.assertNumQueries(0):
+            response = self.client.get(self.detail_url)
+        self.assertEqual(response["X-Cache"], "HIT")
+        self.assertEqual(response.data["name"], "Alice dos Santos")
+
+    def test_cached_response_answers_conditional_get(self):
+        etag = self.client.get(self.detail_url)["ETag"]
+        response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response["X-Cache"], "HIT")
+
+    def test_update_invalidates_list_and_detail(self):
+        self.client.get(self.list_url)
+        self.client.get(self.detail_url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(self.detail_url, {"name": "Alice Souza"}, format="json")
+
+        response = self.client.get(self.list_url)
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(response.data["results"][0]["name"], "Alice Souza")
+        response = self.client.get(self.detail_url)
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(response.data["name"], "Alice Souza")
+
+    def test_create_invalidates_list_only(self):
+        self.client.get(self.list_url)
+        self.client.get(self.detail_url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Professional.objects.create(
+                name="Maria da Silva",
+                profession=Professional.ProfessionChoices.GYNECOLOGIST,
+                street="Rua das Couves",
+                number="123",
+                neighborhood="Centro",
+                city="Rio de Janeiro",
+                state="RJ",
+                zipcode="12345678",
+                phone="2111112222",
+                email="maria@example.com",
+            )
+
+        response = self.client.get(self.list_url)
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(response.data["count"], 2)
+        self.assertEqual(self.client.get(self.detail_url)["X-Cache"], "HIT")
+
+    def test_delete_invalidates_list_and_detail(self):
+        self.client.get(self.list_url)
+        self.client.get(self.detail_url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(self.detail_url)
+
+        response = self.client.get(self.list_url)
+        self.assertEqual(response.data["count"], 0)
+        response = self.client.get(self.detail_url)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_invalidation_waits_for_the_commit(self):
+        self.client.get(self.detail_url)
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.professional.save()
+            self.assertEqual(self.client.get(self.detail_url)["X-Cache"], "HIT")
+        self.assertEqual(len(callbacks), 1)
+
+        callbacks[0]()
+        self.assertEqual(self.client.get(self.detail_url)["X-Cache"], "MISS")
+
+    def test_cache_stats(self):
+        self.client.get(self.list_url)
+        self.client.get(self.list_url)
+        self.client.get(self.list_url)
+
+        url = reverse("professional-cache-stats")
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        self.user.is_staff = True
+        self.user.save()
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {"hits": 2, "misses": 1, "hit_ratio": 0.6667})
+
+    @override_settings(CACHE_RESPONSES=False)
+    def test_responses_are_not_cached_without_a_shared_cache(self):
+        self.client.get(self.list_url)
+        response = self.client.get(self.list_url)
+        self.assertNotIn("X-Cache", response)
+        self.assertIn("ETag", response)
+        self.assertNotIn("X-Cache", self.client.get(self.detail_url))
+
+
+class ProfessionalSearchTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            email="test@example.com", password="testpass"
+        )
+
+        self.token = Token.objects.get(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token.key}")
+
+        self.dermatologist = self.make_professional(
+            "Ana Souza", "DERMATOLOGISTA", "Pinheiros"
+        )
+        self.psychologist = self.make_professional("João Lima", "PSICOLOGO", "Moema")
+        self.other_dermatologist = self.make_professional(
+            "Beatriz Ramos", "DERMATOLOGISTA", "Moema"
+        )
+        self.url = reverse("professional-list")
+
+    def make_professional(self, name, profession, neighborhood):
+        return Professional.objects.create(
+            name=name,
+            profession=profession,
+            street="Rua das Couves",
+            number="123",
+            neighborhood=neighborhood,
+            city="São Paulo",
+            state="SP",
+            zipcode="12345678",
+            phone="1111112222",
+            email=f"{name.split()[0].lower()}@example.com",
+        )
+
+    def search(self, q):
+        response = self.client.get(self.url, {"q": q})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [result["id"] for result in response.data["results"]]
+
+    def test_search_by_profession_and_neighborhood(self):
+        self.assertEqual(
+            self.search("dermatologista pinheiros"), [self.dermatologist.id]
+        )
+
+    def test_search_ignores_accents_and_case(self):
+        self.assertEqual(self.search("PSICOLOGO"), [self.psychologist.id])
+        self.assertEqual(self.search("joao"), [self.psychologist.id])
+
+    def test_search_ranks_results(self):
+        # Both live in Moema, but only one has the name searched.
+        self.assertEqual(self.search("beatriz moema"), [self.other_dermatologist.id])
+        self.assertEqual(
+            self.search("moema"),
+            [self.psychologist.id, self.other_dermatologist.id],
+        )
+
+    def test_search_tolerates_typos(self):
+        self.assertEqual(
+            self.search("dermatologsta"),
+            [self.dermatologist.id, self.other_dermatologist.id],
+        )
+
+    def test_search_without_matches(self):
+        self.assertEqual(self.search("cardiologista"), [])
+
+    def test_empty_search_lists_everything(self):
+        self.assertEqual(len(self.search("")), 3)
+
+    def test_search_query_budget(self):
+        # token, full-text check, fingerprint, count, page
+        with self.assertNumQueries(5):
+            self.client.get(self.url, {"q": "dermatologista"})
+
+
+class ProfessionalUpcomingAppointmentsTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            email="test@example.com", password="testpass"
+        )
+
+        self.token = Token.objects.get(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token.key}")
+
+        now = timezone.now()
+        self.professionals = []
+        for index in range(3):
+            professional = Professional.objects.create(
+                name=f"Profissional {index}",
+                profession=Professional.ProfessionChoices.GENERAL_PRACTITIONER,
+                street="Rua das Couves",
+                number="123",
+                neighborhood="Centro",
+                city="Rio de Janeiro",
+                state="RJ",
+                zipcode="12345678",
+                phone="2111112222",
+                email=f"profissional{index}@example.com",
+            )
+            Appointment.objects.bulk_create(
+                Appointment(
+                    professional=professional,
+                    scheduled_at=now + datetime.timedelta(hours=hour),
+                )
+                for hour in range(-2, 6)
+            )
+            self.professionals.append(professional)
+        self.list_url = reverse("professional-list")
+        self.params = {"include": "upcoming_appointments", "limit": 3}
+
+    def test_list_includes_upcoming_appointments(self):
+        # token, count, page, upcoming appointments of the whole page
+        with self.assertNumQueries(4):
+            response = self.client.get(self.list_url, self.params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        for item in response.data["results"]:
+            expected = Appointment.objects.filter(
+                professional_id=item["id"], scheduled_at__gte=timezone.now()
+            ).values_list("id", flat=True)[:3]
+            self.assertEqual(
+                [appointment["id"] for appointment in item["upcoming_appointments"]],
+                list(expected),
+            )
+
+    def test_retrieve_includes_upcoming_appointments(self):
+        url = reverse("professional-detail", args=[self.professionals[0].id])
+        # token, professional, upcoming appointments
+        with self.assertNumQueries(3):
+            response = self.client.get(url, self.params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["upcoming_appointments"]), 3)
+        self.assertEqual(
+            list(response.data["upcoming_appointments"][0]), ["id", "scheduled_at"]
+        )
+        self.assertNotIn("ETag", response)
+
+    def test_upcoming_appointments_are_opt_in(self):
+        response = self.client.get(self.list_url)
+        self.assertNotIn("upcoming_appointments", response.data["results"][0])
+
+    def test_include_rejects_invalid_parameters(self):
+        response = self.client.get(self.list_url, {"include": "appointments"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("include", response.data)
+
+        params = {"include": "upcoming_appointments", "limit": 0}
+        response = self.client.get(self.list_url, params)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("limit", response.data)
+
+
+class ProfessionalFacetsTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            email="test@example.com", password="testpass"
+        )
+
+        self.token = Token.objects.get(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token.key}")
+
+        self.make_professional("Ana Souza", "DERMATOLOGISTA", "São Paulo", "SP")
+        self.make_professional("Beatriz Ramos", "DERMATOLOGISTA", "Santos", "SP")
+        self.make_professional("João Lima", "PSICOLOGO", "Niterói", "RJ")
+        self.url = reverse("professional-facets")
+
+    def make_professional(self, name, profession, city, state):
+        return Professional.objects.create(
+            name=name,
+            profession=profession,
+            street="Rua das Couves",
+            number="123",
+            neighborhood="Centro",
+            city=city,
+            state=state,
+            zipcode="12345678",
+            phone="1111112222",
+            email=f"{name.split()[0].lower()}@example.com",
+        )
+
+    def test_facets_count_every_facet(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.data["profession"],
+            [
+                {"value": "DERMATOLOGISTA", "label": "Dermatologista", "count": 2},
+                {"value": "PSICOLOGO", "label": "Psicólogo", "count": 1},
+            ],
+        )
+        self.assertEqual(
+            [(item["value"], item["count"]) for item in response.data["state"]],
+            [("SP", 2), ("RJ", 1)],
+        )
+        self.assertEqual(len(response.data["city"]), 3)
+
+    def test_facets_respect_list_filters(self):
+        response = self.client.get(self.url, {"facets": "state", "q": "dermatologista"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(list(response.data), ["state"])
+        self.assertEqual(
+            response.data["state"], [{"value": "SP", "label": "SP", "count": 2}]
+        )
+
+    @override_settings(CACHE_RESPONSES=True)
+    def test_facets_query_budget(self):
+        # token, counts of every facet (then none, both are cached)
+        with self.assertNumQueries(2):
+            response = self.client.get(self.url)
+        self.assertEqual(response["X-Cache"], "MISS")
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url)
+        self.assertEqual(response["X-Cache"], "HIT")
+
+    @override_settings(CACHE_RESPONSES=True)
+    def test_facets_cache_is_invalidated_on_change(self):
+        self.client.get(self.url, {"facets": "state"})
+        with self.captureOnCommitCallbacks(execute=True):
+            self.make_professional("Carla Dias", "PSICOLOGO", "Niterói", "RJ")
+        response = self.client.get(self.url, {"facets": "state"})
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(
+            [(item["value"], item["count"]) for item in response.data["state"]],
+            [("RJ", 2), ("SP", 2)],
+        )
+
+    def test_facets_rejects_invalid_facet(self):
+        response = self.client.get(self.url, {"facets": "profession,email"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("facets", response.data)
+
+
+class ProfessionalProximityTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            email="test@example.com", password="testpass"
+        )
+
+        self.token = Token.objects.get(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token.key}")
+
+        ZipcodeLocation.objects.bulk_create(
+            [
+                ZipcodeLocation(
+                    zipcode="01310100", latitude=-23.5614, longitude=-46.6559
+                ),
+                ZipcodeLocation(
+                    zipcode="05422000", latitude=-23.5670, longitude=-46.6920
+                ),
+                ZipcodeLocation(
+                    zipcode="11010000", latitude=-23.9608, longitude=-46.3336
+                ),
+            ]
+        )
+        self.santos = self.make_professional("santos", "11010000")
+        self.pinheiros = self.make_professional("pinheiros", "05422000")
+        self.paulista = self.make_professional("paulista", "01310100")
+        self.url = reverse("professional-list")
+
+    def make_professional(self, name, zipcode):
+        return Professional.objects.create(
+            name=name,
+            profession=Professional.ProfessionChoices.CARDIOLOGIST,
+            street="Rua das Couves",
+            number="123",
+            neighborhood="Centro",
+            city="São Paulo",
+            state="SP",
+            zipcode=zipcode,
+            phone="1111112222",
+            email=f"{name}@example.com",
+        )
+
+    def test_coordinates_are_filled_on_save(self):
+        # Computed by the INSERT, then each loaded on first access
+        self.assertEqual(self.paulista.get_deferred_fields(), {"latitude", "longitude"})
+        with self.assertNumQueries(2):
+            self.assertEqual(
+                (self.paulista.latitude, self.paulista.longitude),
+                (-23.5614, -46.6559),
+            )
+
+        self.paulista.zipcode = "99999999"
+        self.paulista.save()
+        self.paulista.refresh_from_db()
+        self.assertIsNone(self.paulista.latitude)
+        self.assertIsNone(self.paulista.longitude)
+
+    def test_near_orders_by_distance_within_radius(self):
+        response = self.client.get(self.url, {"near": "01310-100", "radius_km": 10})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = response.data["results"]
+        self.assertEqual(
+            [result["id"] for result in results],
+            [self.paulista.id, self.pinheiros.id],
+        )
+        self.assertEqual(results[0]["distance_km"], 0)
+        self.assertAlmostEqual(results[1]["distance_km"], 3.74, delta=0.05)
+
+    def test_near_with_larger_radius(self):
+        response = self.client.get(self.url, {"near": "01310100", "radius_km": 100})
+        self.assertEqual(
+            [result["id"] for result in response.data["results"]],
+            [self.paulista.id, self.pinheiros.id, self.santos.id],
+        )
+
+    def test_near_unknown_zipcode(self):
+        response = self.client.get(self.url, {"near": "99999999"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data["near"], ["CEP não encontrado."])
+
+    def test_near_invalid_radius(self):
+        response = self.client.get(self.url, {"near": "01310100", "radius_km": 500})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("radius_km", response.data)
+
+    def test_list_without_near_has_no_distance(self):
+        response = self.client.get(self.url)
+        self.assertNotIn("distance_km", response.data["results"][0])
+
+    def test_load_zipcodes_geocodes_professionals(self):
+        professional = self.make_professional("recife", "50010000")
+        self.assertIsNone(professional.latitude)
+
+        with tempfile.NamedTemporaryFile("w", suffix=".csv") as file:
+            file.write("cep,latitude,longitude\n50010-000,-8.0631,-34.8711\n")
+            file.flush()
+            call_command("load_zipcodes", file.name, stdout=io.StringIO())
+
+        professional.refresh_from_db()
+        self.assertEqual(
+            (professional.latitude, professional.longitude), (-8.0631, -34.8711)
+        )
+
+
+class BenchmarkSerializationCommandTest(SimpleTestCase):
+    def test_benchmark_reports_both_serializers(self):
+        stdout = io.StringIO()
+        call_command("benchmark_serialization", rows=10, repeat=1, stdout=stdout)
+        output = stdout.getvalue()
+        self.assertIn("professionals: serializer", output)
+        self.assertIn("appointments: serializer", output)
+
+
+class ImportProfessionalsCommandTest(APITestCase):
+    header = (
+        "name,profession,street,number,complement,neighborhood,city,state,"
+        "zipcode,phone,email\n"
+    )
+
+    def setUp(self):
+        ZipcodeLocation.objects.create(
+            zipcode="01310100", latitude=-23.5614, longitude=-46.6559
+        )
+        self.existing = Professional.objects.create(
+            name="Alice dos Santos",
+            profession=Professional.ProfessionChoices.GENERAL_PRACTITIONER,
+            street="Rua das Couves",
+            number="123",
+            neighborhood="Centro",
+            city="Rio de Janeiro",
+            state="RJ",
+            zipcode="12345678",
+            phone="2111112222",
+            email="alice@example.com",
+        )
+
+    def import_csv(self, content):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = f"{directory.name}/professionals.csv"
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(self.header + content)
+        stdout = io.StringIO()
+        call_command("import_professionals", path, stdout=stdout)
+        return path, stdout.getvalue()
+
+    def test_import_creates_and_updates_professionals(self):
+        _, output = self.import_csv(
+            "Bruno Lima,PSICOLOGO,Av. Paulista,1000,,Bela Vista,São Paulo,SP,"
+            "01310-100,(11) 99999-8888,Bruno@Example.com\n"
+            "Alice Santos,DENTISTA,Rua das Couves,123,,Centro,Rio de Janeiro,RJ,"
+            "12345678,2111112222,ALICE@example.com\n"
+        )
+        self.assertIn("1 professionals created, 1 updated, 0 rejected.", output)
+
+        bruno = Professional.objects.get(email="bruno@example.com")
+        self.assertEqual(bruno.phone, "11999998888")
+        self.assertEqual(bruno.zipcode, "01310100")
+        self.assertEqual(bruno.full_address, bruno.formatted_address())
+        self.assertEqual((bruno.latitude, bruno.longitude), (-23.5614, -46.6559))
+
+        self.existing.refresh_from_db()
+        self.assertEqual(self.existing.name, "Alice Santos")
+        self.assertEqual(self.existing.profession, "DENTISTA")
+        self.assertEqual(Professional.objects.count(), 2)
+
+    def test_import_writes_rejected_rows_to_the_error_report(self):
+        path, output = self.import_csv(
+            "Bruno Lima,PSICOLOGO,Av. Paulista,1000,,Bela Vista,São Paulo,SP,"
+            "01310100,11999998888,bruno@example.com\n"
+            "Bruno Lima,PSICOLOGO,Av. Paulista,1000,,Bela Vista,São Paulo,SP,"
+            "01310100,11999998888,BRUNO@example.com\n"
+            ",ASTRONAUTA,Av. Paulista,1000,,Bela Vista,São Paulo,SP,"
+            "0131,119,not-an-email\n"
+        )
+        self.assertIn("1 professionals created, 0 updated, 2 rejected.", output)
+
+        with open(f"{path}.errors.csv", encoding="utf-8") as file:
+            rows = list(csv.DictReader(file))
+        self.assertEqual([row["line"] for row in rows], ["3", "4"])
+        self.assertIn("email: Email duplicado no arquivo.", rows[0]["errors"])
+        for field in ["name", "profession", "zipcode", "phone", "email"]:
+            self.assertIn(f"{field}: ", rows[1]["errors"])
+
+
+@override_settings(ROOT_URLCONF="config.async_urls")
+class ProfessionalAsyncReadTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            email="test@example.com", password="testpass"
+        )
+
+        self.token = Token.objects.get(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token.key}")
+
+        now = timezone.now()
+        self.professionals = []
+        for index in range(3):
+            professional = Professional.objects.create(
+                name=f"Profissional {index}",
+                profession=Professional.ProfessionChoices.GENERAL_PRACTITIONER,
+                street="Rua das Couves",
+                number="123",
+                neighborhood="Centro",
+                city="Rio de Janeiro",
+                state="RJ",
+                zipcode="12345678",
+                phone="2111112222",
+                email=f"profissional{index}@example.com",
+            )
+            Appointment.objects.create(
+                professional=professional,
+                scheduled_at=now + datetime.timedelta(hours=index + 1),
+            )
+            self.professionals.append(professional)
+        self.list_url = reverse("professional-list")
+        self.detail_url = reverse(
+            "professional-detail", args=[self.professionals[0].id]
+        )
+
+    def get_sync(self, url, params=None):
+        cache.clear()
+        with override_settings(ROOT_URLCONF="config.urls"):
+            return self.client.get(url, params)
+
+    def test_list_and_retrieve_are_async_views(self):
+        for url in [self.list_url, self.detail_url]:
+            self.assertTrue(iscoroutinefunction(resolve(url).func))
+        self.assertFalse(iscoroutinefunction(resolve(self.list_url + "facets/").func))
+
+    def test_async_responses_match_the_sync_views(self):
+        cases = [
+            (self.list_url, None),
+            (self.list_url, {"page": 1}),
+            (self.list_url, {"fields": "id,name"}),
+            (self.list_url, {"include": "upcoming_appointments"}),
+            (self.detail_url, None),
+            (self.detail_url, {"include": "upcoming_appointments"}),
+        ]
+        for url, params in cases:
+            with self.subTest(url=url, params=params):
+                cache.clear()
+                response = self.client.get(url, params)
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                self.assertEqual(response.content, self.get_sync(url, params).content)
+
+    @override_settings(CACHE_RESPONSES=True)
+    def test_async_responses_are_cached_and_validated(self):
+        response = self.client.get(self.list_url)
+        self.assertEqual(response["X-Cache"], "MISS")
+        response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response["X-Cache"], "HIT")
+
+    def test_async_errors(self):
+        url = reverse("professional-detail", args=[0])
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_404_NOT_FOUND)
+        response = self.client.get(self.list_url, {"page": 99})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+        self.client.credentials()
+        response = self.client.get(self.list_url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_writes_use_the_sync_view(self):
+        response = self.client.delete(self.detail_url)
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(
+            Professional.objects.filter(id=self.professionals[0].id).exists()
+        )
+
+    async def test_async_client(self):
+        headers = {"Authorization": f"Token {self.token.key}"}
+        response = await self.async_client.get(self.detail_url, headers=headers)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()["id"], self.professionals[0].id)
+
+
+class BenchmarkConcurrencyCommandTest(SimpleTestCase):
+    def test_benchmark_reports_the_throughput(self):
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                self.send_response(200)
+                self.send_header("Content-Length", "2")
+                self.end_headers()
+                self.wfile.write(b"{}")
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+
+        stdout = io.StringIO()
+        call_command(
+            "benchmark_concurrency",
+            f"http://127.0.0.1:{server.server_port}/",
+            requests=20,
+            concurrency=4,
+            stdout=stdout,
+        )
+        output = stdout.getvalue()
+        self.assertIn("20 requests, concurrency 4:", output)
+        self.assertIn("200: 20", output)
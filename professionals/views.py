@@ -1,11 +1,233 @@
+from django.db import transaction
+from django.db.models import Count, F, Value, Window
+from django.db.models.functions import RowNumber
+from django.utils import timezone
 from rest_framework import viewsets
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.decorators import action
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
+from rest_framework.response import Response
 
-from .models import Professional
-from .serializers import ProfessionalSerializer
+from appointments.models import Appointment
+from appointments.serializers import UpcomingAppointmentSerializer
+from config.asynchronous import AsyncReadMixin
+from config.cache import CachedResponseMixin, get_version, list_version_key
+from config.exports import ExportMixin
+from config.values import ValuesReadMixin, ValuesRenderer
 
+from .availability import free_slots
+from .filters import ProfessionalFilter
+from .models import CACHE_PREFIX, Professional, WorkingHours
+from .serializers import (
+    AvailabilityQuerySerializer,
+    FacetsQuerySerializer,
+    ProfessionalSerializer,
+    UpcomingAppointmentsQuerySerializer,
+    WorkingHoursSerializer,
+)
 
-class ProfessionalViewSet(viewsets.ModelViewSet):
+
+class ProfessionalViewSet(
+    CachedResponseMixin,
+    ExportMixin,
+    AsyncReadMixin,
+    ValuesReadMixin,
+    viewsets.ModelViewSet,
+):
     permission_classes = [IsAuthenticated]
     serializer_class = ProfessionalSerializer
-    queryset = Professional.objects.all()
+    # The search columns are only used to filter and rank
+    queryset = Professional.objects.defer("search_vector", "search_text")
+    filterset_class = ProfessionalFilter
+    cache_prefix = CACHE_PREFIX
+    export_fields = {
+        field: field
+        for field in [
+            "id",
+            "name",
+            "profession",
+            "street",
+            "number",
+            "complement",
+            "neighborhood",
+            "city",
+            "state",
+            "zipcode",
+            "phone",
+            "email",
+            "created_at",
+            "updated_at",
+        ]
+    }
+
+    includes = {"upcoming_appointments": "include_upcoming_appointments"}
+    # Read by the includes
+    values_lookups = ["id"]
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action in ("list", "retrieve"):
+            queryset = ProfessionalSerializer.setup_eager_loading(queryset)
+        return queryset
+
+    def is_cacheable(self, request):
+        # Upcoming appointments change over time, without any write to the
+        # professionals.
+        return not self.get_includes()
+
+    def include_upcoming_appointments(self, rows, data):
+        """
+        Embed the next `limit` appointments of each professional.
+
+        The appointments of the whole page are fetched with a single query:
+        ROW_NUMBER() over the appointments of each professional, in the
+        (professional, scheduled_at) index order, keeps the first `limit`.
+        """
+        query = UpcomingAppointmentsQuerySerializer(data=self.request.query_params)
+        query.is_valid(raise_exception=True)
+        limit = query.validated_data["limit"]
+
+        renderer = ValuesRenderer(
+            UpcomingAppointmentSerializer(context=self.get_serializer_context())
+        )
+        position = Window(
+            RowNumber(),
+            partition_by=F("professional_id"),
+            order_by=[F("scheduled_at").asc(), F("id").asc()],
+        )
+        appointments = (
+            Appointment.objects.filter(
+                professional_id__in=[row["id"] for row in rows],
+                scheduled_at__gte=timezone.now(),
+            )
+            .annotate(position=position)
+            .filter(position__lte=limit)
+            .order_by("scheduled_at", "id")
+            .values("professional_id", *renderer.lookups)
+        )
+
+        upcoming = {row["id"]: [] for row in rows}
+        for appointment in appointments:
+            upcoming[appointment["professional_id"]].append(
+                renderer.render(appointment)
+            )
+        for row, item in zip(rows, data):
+            item["upcoming_appointments"] = upcoming[row["id"]]
+
+    @action(
+        detail=False,
+        methods=["get"],
+        url_path="cache-stats",
+        permission_classes=[IsAdminUser],
+    )
+    def cache_stats(self, request):
+        """Hit and miss counters of the list and detail response cache."""
+        return Response(self.get_cache_stats())
+
+    @action(detail=False, methods=["get"], serializer_class=FacetsQuerySerializer)
+    def facets(self, request):
+        """
+        Count the professionals matching the list filters per value of each
+        requested facet (profession, state, city), most frequent first.
+
+        Each facet is a GROUP BY over the filtered queryset, and all of them
+        are combined with UNION ALL into a single query. Responses are cached
+        per filter combination and invalidated together with the list.
+        """
+        query = FacetsQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        facets = query.validated_data["facets"]
+        version = get_version(list_version_key(self.cache_prefix))
+        return self.cached_response(
+            request,
+            f"facets:{version}",
+            lambda: Response(self.count_facets(facets)),
+        )
+
+    def count_facets(self, facets):
+        queryset = self.filter_queryset(self.get_queryset()).order_by()
+        counts = [
+            queryset.annotate(facet=Value(facet), value=F(facet))
+            .values("facet", "value")
+            .annotate(count=Count("pk"))
+            for facet in facets
+        ]
+        rows = counts[0].union(*counts[1:], all=True)
+
+        labels = {"profession": dict(Professional.ProfessionChoices.choices)}
+        data = {facet: [] for facet in facets}
+        for row in sorted(rows, key=lambda row: (-row["count"], row["value"])):
+            facet, value = row["facet"], row["value"]
+            data[facet].append(
+                {
+                    "value": value,
+                    "label": labels.get(facet, {}).get(value, value),
+                    "count": row["count"],
+                }
+            )
+        return data
+
+    @action(
+        detail=True,
+        methods=["get", "put"],
+        url_path="working-hours",
+        serializer_class=WorkingHoursSerializer,
+    )
+    def working_hours(self, request, pk=None):
+        """
+        Return the weekly working hours of the professional. PUT replaces the
+        whole schedule with the submitted list.
+        """
+        professional = self.get_object()
+        if request.method == "PUT":
+            serializer = WorkingHoursSerializer(data=request.data, many=True)
+            serializer.is_valid(raise_exception=True)
+            with transaction.atomic():
+                professional.working_hours.all().delete()
+                WorkingHours.objects.bulk_create(
+                    WorkingHours(professional=professional, **attrs)
+                    for attrs in serializer.validated_data
+                )
+
+        working_hours = professional.working_hours.all()
+        return Response(WorkingHoursSerializer(working_hours, many=True).data)
+
+    @action(detail=True, methods=["get"], serializer_class=AvailabilityQuerySerializer)
+    def availability(self, request, pk=None):
+        """
+        List the free slots of the professional between `from` and `to`.
+
+        Combines the working hours with the appointments of the whole period,
+        fetched with a single range query.
+        """
+        query = AvailabilityQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        start, end, slot = (
+            query.validated_data["from"],
+            query.validated_data["to"],
+            query.validated_data["slot"],
+        )
+        professional = self.get_object()
+
+        working_hours = professional.working_hours.values_list(
+            "weekday", "start_time", "end_time"
+        )
+        booked = list(
+            Appointment.objects.filter(
+                professional=professional,
+                scheduled_at__gt=query.validated_data["start_at"] - slot,
+                scheduled_at__lt=query.validated_data["end_at"],
+            )
+            .order_by("scheduled_at")
+            .values_list("scheduled_at", flat=True)
+        )
+
+        slots = free_slots(working_hours, booked, start, end, slot)
+        return Response(
+            {
+                "professional": professional.id,
+                "from": start,
+                "to": end,
+                "slot_minutes": int(slot.total_seconds() // 60),
+                "slots": slots,
+            }
+        )